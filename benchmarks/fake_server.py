@@ -0,0 +1,234 @@
+"""Local stand-in for the OurGroceries web API.
+
+Implements the handful of endpoints the ``ourgroceries`` library talks to
+(sign-in, the ``/your-lists/`` page it scrapes ids from, and the JSON
+command endpoint) over generated data, with configurable latency and
+failure injection.  Every request is counted per upstream command.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import secrets
+from collections import Counter
+from dataclasses import dataclass
+
+from aiohttp import web
+
+SESSION_COOKIE = "ourgroceries-auth"
+TEAM_ID = "bench-team"
+MASTER_LIST_ID = "master"
+CATEGORY_LIST_ID = "categories"
+
+WORDS = (
+    "apple banana carrot milk bread butter cheese eggs flour sugar rice beans "
+    "pasta tomato onion garlic pepper salt chicken beef pork salmon tuna yogurt "
+    "cereal oats coffee tea juice water soda chips salsa lettuce spinach kale "
+    "potato lemon lime orange grape melon berry honey jam peanut almond soap"
+).split()
+
+
+@dataclass
+class FakeServerConfig:
+    """Shape of the generated account and how the server misbehaves."""
+
+    lists: int = 3
+    items_per_list: int = 40
+    master_size: int = 1000
+    categories: int = 15
+    # Seconds added to every request, plus up to ``jitter`` more
+    latency: float = 0.05
+    jitter: float = 0.02
+    # Fraction of commands answered with a 503
+    error_rate: float = 0.0
+    # Invalidate every session after this many commands (0 = never)
+    expire_every: int = 0
+    seed: int = 1
+
+
+class FakeOurGroceries:
+    """aiohttp application emulating OurGroceries for one account."""
+
+    def __init__(self, config: FakeServerConfig) -> None:
+        self.config = config
+        self.requests: Counter[str] = Counter()
+        self._random = random.Random(config.seed)
+        self._ids = itertools.count(1)
+        self._sessions: set[str] = set()
+        self._commands = 0
+        self._lists: dict[str, dict] = {}
+        self._generate()
+
+    def _new_id(self) -> str:
+        return f"i{next(self._ids)}"
+
+    def _generate(self) -> None:
+        rnd = self._random
+        categories = [
+            {"id": f"c{n}", "value": f"Aisle {n}"}
+            for n in range(self.config.categories)
+        ]
+        names = sorted({
+            f"{a} {b}".title() if a != b else a.title()
+            for a, b in itertools.product(WORDS, repeat=2)
+        })
+        rnd.shuffle(names)
+        master = [
+            {
+                "id": self._new_id(),
+                "value": name,
+                "categoryId": rnd.choice(categories)["id"],
+                "addedCount": int(rnd.paretovariate(1.2)),
+            }
+            for name in names[: self.config.master_size]
+        ]
+        self._lists[CATEGORY_LIST_ID] = self._list(
+            CATEGORY_LIST_ID, "Categories", categories
+        )
+        self._lists[MASTER_LIST_ID] = self._list(MASTER_LIST_ID, "Master", master)
+        for n in range(self.config.lists):
+            picked = rnd.sample(master, min(self.config.items_per_list, len(master)))
+            items = [
+                {
+                    "id": self._new_id(),
+                    "value": item["value"],
+                    "categoryId": item["categoryId"],
+                    "crossedOffAt": rnd.randint(1, 10**9) if rnd.random() < 0.2 else 0,
+                }
+                for item in picked
+            ]
+            self._lists[f"l{n}"] = self._list(f"l{n}", f"List {n}", items)
+
+    @staticmethod
+    def _list(list_id: str, name: str, items: list[dict]) -> dict:
+        return {"id": list_id, "name": name, "versionId": "1", "items": items}
+
+    @property
+    def shopping_list_ids(self) -> list[str]:
+        return [
+            lid for lid in self._lists
+            if lid not in (MASTER_LIST_ID, CATEGORY_LIST_ID)
+        ]
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/sign-in", self._sign_in)
+        app.router.add_get("/your-lists/", self._your_lists_page)
+        app.router.add_post("/your-lists/", self._command)
+        return app
+
+    async def _delay(self) -> None:
+        await asyncio.sleep(
+            self.config.latency + self._random.random() * self.config.jitter
+        )
+
+    async def _sign_in(self, request: web.Request) -> web.Response:
+        self.requests["sign-in"] += 1
+        await self._delay()
+        token = secrets.token_hex(8)
+        self._sessions.add(token)
+        response = web.Response(text="ok")
+        response.set_cookie(SESSION_COOKIE, token)
+        return response
+
+    async def _your_lists_page(self, request: web.Request) -> web.Response:
+        self.requests["your-lists page"] += 1
+        await self._delay()
+        metalist = json.dumps([{"id": CATEGORY_LIST_ID, "listType": "CATEGORY"}])
+        return web.Response(
+            content_type="text/html",
+            text=(
+                f'<script>g_teamId = "{TEAM_ID}";\n'
+                f"g_staticMetalist = {metalist};\n"
+                f'g_masterListUrl = "/your-lists/list/{MASTER_LIST_ID}"\n'
+                "</script>"
+            ),
+        )
+
+    async def _command(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        command = payload.get("command", "")
+        self.requests[command] += 1
+        self._commands += 1
+        await self._delay()
+
+        if self._random.random() < self.config.error_rate:
+            return web.Response(
+                status=503, content_type="text/html", text="unavailable"
+            )
+        expire = self.config.expire_every
+        if expire and self._commands % expire == 0:
+            self._sessions.clear()
+        if request.cookies.get(SESSION_COOKIE) not in self._sessions:
+            # What OurGroceries does for an expired session
+            return web.Response(content_type="text/html", text="<html>sign in")
+
+        handler = getattr(self, f"_cmd_{command}", None)
+        if handler is None:
+            return web.json_response({})
+        return web.json_response(handler(payload))
+
+    def _bump(self, list_id: str) -> None:
+        lst = self._lists[list_id]
+        lst["versionId"] = str(int(lst["versionId"]) + 1)
+
+    def _item(self, payload: dict) -> dict | None:
+        for item in self._lists[payload["listId"]]["items"]:
+            if item["id"] == payload["itemId"]:
+                return item
+        return None
+
+    def _cmd_getOverview(self, payload: dict) -> dict:
+        return {
+            "shoppingLists": [
+                {
+                    "id": lst["id"],
+                    "name": lst["name"],
+                    "versionId": lst["versionId"],
+                    "activeCount": sum(
+                        1 for i in lst["items"] if not i.get("crossedOffAt")
+                    ),
+                }
+                for lst in map(self._lists.get, self.shopping_list_ids)
+            ]
+        }
+
+    def _cmd_getList(self, payload: dict) -> dict:
+        return {"list": self._lists[payload["listId"]]}
+
+    def _cmd_insertItem(self, payload: dict) -> dict:
+        item = {"id": self._new_id(), "value": payload["value"]}
+        if payload.get("categoryId"):
+            item["categoryId"] = payload["categoryId"]
+        self._lists[payload["listId"]]["items"].append(item)
+        self._bump(payload["listId"])
+        return {}
+
+    def _cmd_deleteItem(self, payload: dict) -> dict:
+        lst = self._lists[payload["listId"]]
+        lst["items"] = [i for i in lst["items"] if i["id"] != payload["itemId"]]
+        self._bump(payload["listId"])
+        return {}
+
+    def _cmd_setItemCrossedOff(self, payload: dict) -> dict:
+        item = self._item(payload)
+        if item is not None:
+            item["crossedOffAt"] = next(self._ids) if payload["crossedOff"] else 0
+            self._bump(payload["listId"])
+        return {}
+
+    def _cmd_changeItemValue(self, payload: dict) -> dict:
+        item = self._item(payload)
+        if item is not None:
+            item["value"] = payload["newValue"]
+            if payload.get("categoryId"):
+                item["categoryId"] = payload["categoryId"]
+            self._bump(payload["listId"])
+        return {}
+
+    def _cmd_deleteAllCrossedOffItems(self, payload: dict) -> dict:
+        lst = self._lists[payload["listId"]]
+        lst["items"] = [i for i in lst["items"] if not i.get("crossedOffAt")]
+        self._bump(payload["listId"])
+        return {}
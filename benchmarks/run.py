@@ -0,0 +1,403 @@
+"""Benchmark the integration against the fake OurGroceries server.
+
+Runs the real integration inside a test Home Assistant instance, pointed
+at ``fake_server`` through the ``ourgroceries`` library, and drives its
+WebSocket handlers from a number of simulated kiosks through real
+``ActiveConnection`` objects.  Each phase reports per-command latency
+percentiles and reply sizes, upstream requests by upstream command, and
+how long the Home Assistant event loop thread was busy.
+
+Needs Home Assistant and pytest-homeassistant-custom-component installed.
+From the repository root:
+
+    python -m benchmarks.run --kiosks 10 --rounds 20
+    python -m benchmarks.run --latency 0.2 --error-rate 0.05 --json out.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import ourgroceries
+from aiohttp import web
+from homeassistant import loader
+from homeassistant.components.websocket_api.connection import ActiveConnection
+from homeassistant.components.websocket_api.http import WebSocketAdapter
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+from homeassistant.setup import async_setup_component
+from homeassistant.util.json import json_loads
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.ourgroceries_kiosk.const import DOMAIN
+
+from .fake_server import WORDS, FakeOurGroceries, FakeServerConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PhaseResult:
+    """Measurements for one phase of the run."""
+
+    name: str
+    wall: float = 0.0
+    loop_busy: float = 0.0
+    upstream: Counter[str] = field(default_factory=Counter)
+    latencies: dict[str, list[float]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    reply_bytes: dict[str, list[int]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    errors: Counter[str] = field(default_factory=Counter)
+    events: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "wall_ms": self.wall * 1000,
+            "loop_busy_ms": self.loop_busy * 1000,
+            "upstream": dict(self.upstream),
+            "events": self.events,
+            "commands": {
+                command: {
+                    "calls": len(samples),
+                    "errors": self.errors[command],
+                    **{
+                        f"p{p}_ms": _percentile(samples, p) * 1000
+                        for p in (50, 95, 99)
+                    },
+                    "max_ms": max(samples) * 1000,
+                    "avg_bytes": sum(self.reply_bytes[command]) / len(samples),
+                }
+                for command, samples in self.latencies.items()
+            },
+        }
+
+
+def _percentile(samples: list[float], pct: int) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class Kiosk:
+    """One simulated card, talking to the handlers over a real connection."""
+
+    _connids = itertools.count(1)
+
+    def __init__(self, hass: HomeAssistant, user, refresh_token) -> None:
+        self._ids = itertools.count(1)
+        self._pending: dict[int, tuple[str, float, asyncio.Future]] = {}
+        self.phase: PhaseResult | None = None
+        self.versions: dict[str, str] = {}
+        self.items: dict[str, list[dict]] = {}
+        self.categories_hash: str | None = None
+        self.connection = ActiveConnection(
+            WebSocketAdapter(_LOGGER, {"connid": next(self._connids)}),
+            hass,
+            self._receive,
+            user,
+            refresh_token,
+        )
+
+    def _receive(self, message: bytes | str | dict) -> None:
+        # Serialize like the WebSocket writer would, to count reply bytes
+        payload = message if isinstance(message, (bytes, str)) else json_bytes(message)
+        msg = json_loads(payload)
+        if msg["type"] == "event":
+            if self.phase is not None:
+                self.phase.events += 1
+            return
+        command, start, future = self._pending.pop(msg["id"])
+        if self.phase is not None:
+            self.phase.latencies[command].append(time.perf_counter() - start)
+            self.phase.reply_bytes[command].append(len(payload))
+            if not msg["success"]:
+                self.phase.errors[command] += 1
+        future.set_result(msg)
+
+    async def call(self, command: str, **data) -> dict | None:
+        """Send a command and return its result, or None if it failed."""
+        msg_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = (command, time.perf_counter(), future)
+        self.connection.async_handle(
+            {"id": msg_id, "type": f"{DOMAIN}/{command}", **data}
+        )
+        msg = await future
+        return msg["result"] if msg["success"] else None
+
+    async def load_list(self, list_id: str) -> None:
+        data = {"list_id": list_id}
+        if list_id in self.versions:
+            data["version"] = self.versions[list_id]
+        result = await self.call("get_list_items", **data)
+        if result is None:
+            return
+        self.versions[list_id] = result["version"]
+        if "items" in result:
+            self.items[list_id] = result["items"]
+        elif "delta" in result:
+            delta = result["delta"]
+            changed = {i["id"]: i for i in delta["added"] + delta["updated"]}
+            kept = [
+                changed.pop(i["id"], i) for i in self.items.get(list_id, [])
+                if i["id"] not in delta["removed"]
+            ]
+            self.items[list_id] = kept + list(changed.values())
+
+    async def load_categories(self) -> None:
+        data = {"hash": self.categories_hash} if self.categories_hash else {}
+        result = await self.call("get_categories", **data)
+        if result is not None:
+            self.categories_hash = result.get("hash")
+
+
+class Benchmark:
+    """Runs the phases against one integration instance."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        server: FakeOurGroceries,
+        kiosks: list[Kiosk],
+        rounds: int,
+        seed: int,
+    ) -> None:
+        self.hass = hass
+        self.server = server
+        self.kiosks = kiosks
+        self.rounds = rounds
+        self.list_ids = server.shopping_list_ids
+        self._random = random.Random(seed)
+
+    async def run(self) -> list[PhaseResult]:
+        return [
+            await self._phase("startup", self._startup),
+            await self._phase("browse", self._browse),
+            await self._phase("search", self._search),
+            await self._phase("mutate", self._mutate),
+            await self._phase("resync", self._resync),
+        ]
+
+    async def _phase(
+        self, name: str, body: Callable[[Kiosk], Awaitable[None]]
+    ) -> PhaseResult:
+        result = PhaseResult(name)
+        for kiosk in self.kiosks:
+            kiosk.phase = result
+        before = Counter(self.server.requests)
+        busy = time.thread_time()
+        start = time.perf_counter()
+        await asyncio.gather(*(body(kiosk) for kiosk in self.kiosks))
+        await self.hass.async_block_till_done()
+        result.wall = time.perf_counter() - start
+        result.loop_busy = time.thread_time() - busy
+        result.upstream = Counter(self.server.requests) - before
+        return result
+
+    async def _startup(self, kiosk: Kiosk) -> None:
+        await kiosk.call("subscribe")
+        await asyncio.gather(kiosk.call("get_lists"), kiosk.load_categories())
+        await kiosk.call("get_item_list_map")
+        await kiosk.load_list(self._random.choice(self.list_ids))
+
+    async def _browse(self, kiosk: Kiosk) -> None:
+        for _ in range(self.rounds):
+            await kiosk.load_list(self._random.choice(self.list_ids))
+
+    async def _search(self, kiosk: Kiosk) -> None:
+        for _ in range(self.rounds):
+            word = self._random.choice(WORDS)
+            query = word[: self._random.randint(1, len(word))]
+            await kiosk.call("search_items", query=query)
+
+    async def _mutate(self, kiosk: Kiosk) -> None:
+        for n in range(self.rounds):
+            list_id = self._random.choice(self.list_ids)
+            await kiosk.load_list(list_id)
+            await kiosk.call(
+                "add_item", list_id=list_id, name=f"Bench item {id(kiosk)} {n}"
+            )
+            active = [
+                i for i in kiosk.items.get(list_id, [])
+                if not i["crossed_off"] and not i["id"].startswith("pending:")
+            ]
+            if active:
+                await kiosk.call(
+                    "toggle_crossed_off",
+                    list_id=list_id,
+                    item_id=self._random.choice(active)["id"],
+                    cross_off=True,
+                )
+        await self._wait_for_queue()
+
+    async def _wait_for_queue(self) -> None:
+        queue = next(iter(self.hass.data[DOMAIN].values())).queue
+        while any(queue.touches(list_id) for list_id in self.list_ids):
+            await asyncio.sleep(0.01)
+
+    async def _resync(self, kiosk: Kiosk) -> None:
+        for _ in range(self.rounds):
+            await asyncio.gather(kiosk.call("get_lists"), kiosk.load_categories())
+            for list_id in list(kiosk.versions):
+                await kiosk.load_list(list_id)
+            await kiosk.call("get_item_list_map")
+
+
+def _start_fake_server(server: FakeOurGroceries) -> tuple[str, Callable[[], None]]:
+    """Serve the fake API from its own thread and event loop.
+
+    Keeping it off the Home Assistant loop keeps its work out of the
+    loop-busy measurement.  Returns the base URL and a stop callable.
+    """
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    runner = web.AppRunner(server.app())
+    address: list[str] = []
+
+    async def start() -> None:
+        await runner.setup()
+        site = web.TCPSite(runner, "localhost", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        # A host name, not an IP: aiohttp's cookie jar ignores IP hosts.
+        address.append(f"http://localhost:{port}")
+        ready.set()
+
+    def serve() -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(start())
+        loop.run_forever()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+    thread = threading.Thread(target=serve, name="fake-ourgroceries", daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop() -> None:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return address[0], stop
+
+
+def _point_library_at(base_url: str) -> None:
+    ourgroceries.BASE_URL = base_url
+    ourgroceries.SIGN_IN = f"{base_url}/sign-in"
+    ourgroceries.YOUR_LISTS = f"{base_url}/your-lists/"
+
+
+async def _async_run(args: argparse.Namespace) -> list[PhaseResult]:
+    server = FakeOurGroceries(
+        FakeServerConfig(
+            lists=args.lists,
+            items_per_list=args.items,
+            master_size=args.master,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            expire_every=args.expire_every,
+            seed=args.seed,
+        )
+    )
+    base_url, stop_server = _start_fake_server(server)
+    _point_library_at(base_url)
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            async with async_test_home_assistant(config_dir=config_dir) as hass:
+                # Load custom_components from the repository checkout
+                hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+                await async_setup_component(
+                    hass, "http", {"http": {"server_host": "127.0.0.1"}}
+                )
+                await async_setup_component(hass, "websocket_api", {})
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    data={"username": "bench", "password": "bench"},
+                )
+                entry.add_to_hass(hass)
+                if not await hass.config_entries.async_setup(entry.entry_id):
+                    raise RuntimeError("Integration setup failed")
+                await hass.async_block_till_done()
+
+                user = await hass.auth.async_create_system_user("bench")
+                token = await hass.auth.async_create_refresh_token(user)
+                kiosks = [Kiosk(hass, user, token) for _ in range(args.kiosks)]
+                results = await Benchmark(
+                    hass, server, kiosks, args.rounds, args.seed
+                ).run()
+                await hass.config_entries.async_unload(entry.entry_id)
+                await hass.async_stop(force=True)
+                return results
+    finally:
+        stop_server()
+
+
+def _print_report(results: list[PhaseResult]) -> None:
+    for phase in results:
+        data = phase.as_dict()
+        print(
+            f"\n== {phase.name}: {data['wall_ms']:.0f} ms wall, "
+            f"{data['loop_busy_ms']:.0f} ms loop busy, {phase.events} events"
+        )
+        upstream = ", ".join(
+            f"{cmd}={n}" for cmd, n in sorted(phase.upstream.items())
+        )
+        print(f"   upstream: {sum(phase.upstream.values())} ({upstream or '-'})")
+        print(
+            f"   {'command':<22}{'calls':>7}{'errors':>7}{'p50':>9}{'p95':>9}"
+            f"{'p99':>9}{'max':>9}{'bytes':>9}"
+        )
+        for command, stats in sorted(data["commands"].items()):
+            print(
+                f"   {command:<22}{stats['calls']:>7}{stats['errors']:>7}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+                f"{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+                f"{stats['avg_bytes']:>9.0f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kiosks", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=3)
+    parser.add_argument("--items", type=int, default=40, help="items per list")
+    parser.add_argument("--master", type=int, default=1000, help="master list size")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--expire-every", type=int, default=0,
+        help="expire the session every N upstream commands",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(_async_run(args))
+    _print_report(results)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({r.name: r.as_dict() for r in results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
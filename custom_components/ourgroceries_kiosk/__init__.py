@@ -1,64 +1,156 @@
 """OurGroceries Kiosk — HACS integration for managing OurGroceries lists."""
 
+import asyncio
+import contextlib
 import logging
-import os
+import time
+from functools import wraps
 
 import voluptuous as vol
 from homeassistant.components import websocket_api
-from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
+from . import tracing
 from .api import OurGroceriesAPI
+from .card import CARD_URL, async_register_card
 from .const import (
+    BATCH_CONCURRENCY,
     CONF_PASSWORD,
+    CONF_TRACING,
     CONF_USERNAME,
     DOMAIN,
+    MAX_BATCH_CONCURRENCY,
+    MAX_SEARCH_LIMIT,
+    SEARCH_LIMIT,
     WS_ADD_ITEM,
+    WS_BATCH,
+    WS_COPY_ITEMS,
     WS_DELETE_CROSSED_OFF,
     WS_GET_CATEGORIES,
     WS_GET_ITEM_LIST_MAP,
     WS_GET_LIST_ITEMS,
+    WS_GET_LIST_VIEW,
     WS_GET_LISTS,
+    WS_GET_TRACES,
+    WS_IMPORT_ITEMS,
+    WS_MOVE_ITEMS,
     WS_REMOVE_ITEM,
+    WS_SEARCH_ITEMS,
     WS_SET_ITEM_CATEGORY,
+    WS_SUBSCRIBE,
     WS_TOGGLE_CROSSED_OFF,
     WS_UPDATE_ITEM,
 )
+from .coordinator import OurGroceriesKioskCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-FRONTEND_DIR = os.path.join(os.path.dirname(__file__), "frontend")
-CARD_URL = f"/{DOMAIN}/ourgroceries-kiosk-card.js"
+PLATFORMS = [Platform.SENSOR, Platform.TODO]
+
+# hass.data flag set once the card and WebSocket commands are registered.
+# They serve every account and outlive entry reloads.
+_DATA_REGISTERED = f"{DOMAIN}_registered"
+
+# One schema per mutation a batch may contain, keyed by "op"
+BATCH_OPERATION_SCHEMA = vol.Any(
+    vol.Schema(
+        {
+            vol.Required("op"): "add_item",
+            vol.Required("list_id"): str,
+            vol.Required("name"): str,
+        }
+    ),
+    vol.Schema(
+        {
+            vol.Required("op"): "remove_item",
+            vol.Required("list_id"): str,
+            vol.Required("item_id"): str,
+        }
+    ),
+    vol.Schema(
+        {
+            vol.Required("op"): "update_item",
+            vol.Required("list_id"): str,
+            vol.Required("item_id"): str,
+            vol.Required("name"): str,
+            vol.Optional("category_id", default=""): str,
+        }
+    ),
+    vol.Schema(
+        {
+            vol.Required("op"): "toggle_crossed_off",
+            vol.Required("list_id"): str,
+            vol.Required("item_id"): str,
+            vol.Required("cross_off"): bool,
+        }
+    ),
+    vol.Schema(
+        {
+            vol.Required("op"): "delete_crossed_off",
+            vol.Required("list_id"): str,
+        }
+    ),
+    vol.Schema(
+        {
+            vol.Required("op"): "set_item_category",
+            vol.Required("item_name"): str,
+            vol.Required("category_name"): str,
+            vol.Optional("list_id", default=""): str,
+        }
+    ),
+)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up OurGroceries Kiosk from a config entry."""
+    # A session of its own per account for the login cookie, on Home
+    # Assistant's pooled connections.  Detached when the entry unloads.
     api = OurGroceriesAPI(
-        entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
+        entry.data[CONF_USERNAME],
+        entry.data[CONF_PASSWORD],
+        session=async_create_clientsession(hass),
     )
-
-    # Validate credentials on setup
-    try:
-        await api.validate_credentials()
-    except Exception:
-        _LOGGER.error("Failed to authenticate with OurGroceries")
-        return False
+    api.tracer.enabled = entry.options.get(CONF_TRACING, False)
+
+    coordinator = OurGroceriesKioskCoordinator(hass, entry, api)
+    # Restore mutations queued before a restart so the first snapshot
+    # already reflects them, then resume flushing them upstream.
+    await coordinator.queue.async_load()
+    if await coordinator.async_restore_snapshot():
+        # Serve the last known data right away; logging in and refreshing
+        # happen in the background.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh"
+        )
+    else:
+        # Nothing to serve yet: validate credentials on setup
+        try:
+            await api.validate_credentials()
+        except Exception:
+            _LOGGER.error("Failed to authenticate with OurGroceries")
+            return False
+        await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.queue.async_start())
+    # Keep the shared refresh cycle running even when no entity listens;
+    # the WebSocket handlers read from the coordinator's snapshot.
+    entry.async_on_unload(coordinator.async_add_listener(lambda: None))
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = api
-
-    # Register the frontend card as a static resource
-    await hass.http.async_register_static_paths(
-        [StaticPathConfig(
-            CARD_URL,
-            os.path.join(FRONTEND_DIR, "ourgroceries-kiosk-card.js"),
-            cache_headers=False,
-        )]
-    )
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Register as a Lovelace resource so users don't have to manually add it
-    await _async_register_lovelace_resource(hass)
+    if hass.data.get(_DATA_REGISTERED):
+        return True
+    hass.data[_DATA_REGISTERED] = True
+
+    # Serve the card and register it as a Lovelace resource so users
+    # don't have to add it manually
+    bundle = await async_register_card(hass)
+    await _async_register_lovelace_resource(hass, bundle.url)
 
     # Register WebSocket handlers
     _register_websocket_handlers(hass)
@@ -66,28 +158,51 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply options that are not read on use."""
+    coordinator: OurGroceriesKioskCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.tracer.enabled = entry.options.get(CONF_TRACING, False)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    hass.data[DOMAIN].pop(entry.entry_id, None)
-    return True
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+    return unload_ok
+
 
+async def _async_register_lovelace_resource(hass: HomeAssistant, url: str) -> None:
+    """Point the card's Lovelace resource at ``url``.
 
-async def _async_register_lovelace_resource(hass: HomeAssistant) -> None:
-    """Register the card JS as a Lovelace resource if not already present."""
-    url = CARD_URL
+    An existing resource for the card (any version) is updated in place
+    and duplicates are removed, so a new card version replaces the old.
+    """
     # Use the lovelace resources collection if available
     try:
         resources = hass.data.get("lovelace", {})
         if hasattr(resources, "resources"):
             res_collection = resources.resources
-            # Check if already registered
-            for item in res_collection.async_items():
-                if url in item.get("url", ""):
-                    return
-            await res_collection.async_create_item(
-                {"url": url, "res_type": "module"}
-            )
-            _LOGGER.info("Registered Lovelace resource: %s", url)
+            if not getattr(res_collection, "loaded", True):
+                await res_collection.async_load()
+            ours = [
+                item for item in res_collection.async_items()
+                if item.get("url", "").split("?")[0] == CARD_URL
+            ]
+            if not ours:
+                await res_collection.async_create_item(
+                    {"url": url, "res_type": "module"}
+                )
+                _LOGGER.info("Registered Lovelace resource: %s", url)
+                return
+            current, *duplicates = ours
+            if current["url"] != url:
+                await res_collection.async_update_item(
+                    current["id"], {"url": url, "res_type": "module"}
+                )
+                _LOGGER.info("Updated Lovelace resource: %s", url)
+            for item in duplicates:
+                await res_collection.async_delete_item(item["id"])
             return
     except Exception:
         pass
@@ -98,70 +213,195 @@ async def _async_register_lovelace_resource(hass: HomeAssistant) -> None:
         hass.data["frontend_extra_module_url"].add(url)
 
 
-def _get_api(hass: HomeAssistant) -> OurGroceriesAPI:
-    """Get the first available API instance."""
-    apis = hass.data.get(DOMAIN, {})
-    if not apis:
+def _mark_stale(
+    coordinator: OurGroceriesKioskCoordinator, result: dict
+) -> dict:
+    """Flag a reply served from the restored snapshot before a refresh."""
+    if coordinator.stale:
+        return {**result, "stale": True}
+    return result
+
+
+class _MeteredConnection:
+    """Connection proxy that notes whether a handler replied with an error."""
+
+    def __init__(self, connection: websocket_api.ActiveConnection) -> None:
+        self._connection = connection
+        self.failed = False
+
+    def send_error(self, msg_id: int, code: str, message: str, **kwargs) -> None:
+        self.failed = True
+        tracing.event("error_reply", code=code, message=message)
+        self._connection.send_error(msg_id, code, message, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._connection, name)
+
+
+def _metered(handler):
+    """Decorator that records a WebSocket handler's latency and outcome.
+
+    Every command is also recorded as a trace while tracing is enabled.
+    """
+
+    def trace(hass: HomeAssistant, msg: dict):
+        try:
+            coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        except ValueError:
+            return contextlib.nullcontext()
+        attrs = {"list_id": msg["list_id"]} if "list_id" in msg else {}
+        return coordinator.tracer.trace(
+            msg["type"].removeprefix(f"{DOMAIN}/"), **attrs
+        )
+
+    def record(hass: HomeAssistant, msg: dict, start: float, failed: bool) -> None:
+        try:
+            coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        except ValueError:
+            return
+        coordinator.metrics.record_command(
+            msg["type"].removeprefix(f"{DOMAIN}/"),
+            time.monotonic() - start,
+            failed,
+        )
+
+    if asyncio.iscoroutinefunction(handler):
+
+        @wraps(handler)
+        async def async_wrapper(hass, connection, msg):
+            metered = _MeteredConnection(connection)
+            start = time.monotonic()
+            try:
+                with trace(hass, msg):
+                    await handler(hass, metered, msg)
+            finally:
+                record(hass, msg, start, metered.failed)
+
+        return async_wrapper
+
+    @wraps(handler)
+    def wrapper(hass, connection, msg):
+        metered = _MeteredConnection(connection)
+        start = time.monotonic()
+        try:
+            with trace(hass, msg):
+                handler(hass, metered, msg)
+        finally:
+            record(hass, msg, start, metered.failed)
+
+    return wrapper
+
+
+def _get_coordinator(
+    hass: HomeAssistant, entry_id: str | None = None
+) -> OurGroceriesKioskCoordinator:
+    """Get the coordinator of a config entry, or the first available one."""
+    coordinators = hass.data.get(DOMAIN, {})
+    if not coordinators:
         raise ValueError("OurGroceries Kiosk integration not configured")
-    return next(iter(apis.values()))
+    if entry_id is None:
+        return next(iter(coordinators.values()))
+    if entry_id not in coordinators:
+        raise ValueError(f"No OurGroceries Kiosk account with entry id {entry_id}")
+    return coordinators[entry_id]
 
 
 def _register_websocket_handlers(hass: HomeAssistant) -> None:
     """Register all WebSocket command handlers."""
 
-    @websocket_api.websocket_command({vol.Required("type"): WS_GET_LISTS})
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_GET_LISTS,
+            vol.Optional("entry_id"): str,
+        }
+    )
     @websocket_api.async_response
+    @_metered
     async def ws_get_lists(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            lists = await api.get_lists()
-            connection.send_result(msg["id"], {"lists": lists})
+            connection.send_result(
+                msg["id"], _mark_stale(coordinator, {"lists": coordinator.lists})
+            )
         except Exception as err:
             connection.send_error(msg["id"], "get_lists_failed", str(err))
 
     @websocket_api.websocket_command(
         {
             vol.Required("type"): WS_GET_LIST_ITEMS,
+            vol.Optional("entry_id"): str,
             vol.Required("list_id"): str,
+            vol.Optional("version"): str,
         }
     )
     @websocket_api.async_response
+    @_metered
     async def ws_get_list_items(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            items = await api.get_list_items(msg["list_id"])
-            connection.send_result(msg["id"], {"items": items})
+            data = await coordinator.async_get_list_items(
+                msg["list_id"], msg.get("version")
+            )
+            connection.send_result(msg["id"], _mark_stale(coordinator, data))
         except Exception as err:
             connection.send_error(msg["id"], "get_list_items_failed", str(err))
 
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_GET_LIST_VIEW,
+            vol.Optional("entry_id"): str,
+            vol.Required("list_id"): str,
+            vol.Optional("version"): str,
+        }
+    )
+    @websocket_api.async_response
+    @_metered
+    async def ws_get_list_view(hass, connection, msg):
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        try:
+            data = await coordinator.async_get_list_view(
+                msg["list_id"], msg.get("version")
+            )
+            connection.send_result(msg["id"], _mark_stale(coordinator, data))
+        except Exception as err:
+            connection.send_error(msg["id"], "get_list_view_failed", str(err))
+
     @websocket_api.websocket_command(
         {
             vol.Required("type"): WS_ADD_ITEM,
+            vol.Optional("entry_id"): str,
             vol.Required("list_id"): str,
             vol.Required("name"): str,
         }
     )
     @websocket_api.async_response
+    @_metered
     async def ws_add_item(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            await api.add_item(msg["list_id"], msg["name"])
-            connection.send_result(msg["id"], {"success": True})
+            result = await coordinator.async_enqueue(
+                "add_item", list_id=msg["list_id"], name=msg["name"]
+            )
+            connection.send_result(msg["id"], {"success": True, **result})
         except Exception as err:
             connection.send_error(msg["id"], "add_item_failed", str(err))
 
     @websocket_api.websocket_command(
         {
             vol.Required("type"): WS_REMOVE_ITEM,
+            vol.Optional("entry_id"): str,
             vol.Required("list_id"): str,
             vol.Required("item_id"): str,
         }
     )
     @websocket_api.async_response
+    @_metered
     async def ws_remove_item(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            await api.remove_item(msg["list_id"], msg["item_id"])
+            await coordinator.async_enqueue(
+                "remove_item", list_id=msg["list_id"], item_id=msg["item_id"]
+            )
             connection.send_result(msg["id"], {"success": True})
         except Exception as err:
             connection.send_error(msg["id"], "remove_item_failed", str(err))
@@ -169,6 +409,7 @@ def _register_websocket_handlers(hass: HomeAssistant) -> None:
     @websocket_api.websocket_command(
         {
             vol.Required("type"): WS_UPDATE_ITEM,
+            vol.Optional("entry_id"): str,
             vol.Required("list_id"): str,
             vol.Required("item_id"): str,
             vol.Required("name"): str,
@@ -176,12 +417,16 @@ def _register_websocket_handlers(hass: HomeAssistant) -> None:
         }
     )
     @websocket_api.async_response
+    @_metered
     async def ws_update_item(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            await api.update_item(
-                msg["list_id"], msg["item_id"], msg["name"],
-                msg.get("category_id", "")
+            await coordinator.async_enqueue(
+                "update_item",
+                list_id=msg["list_id"],
+                item_id=msg["item_id"],
+                name=msg["name"],
+                category_id=msg.get("category_id", ""),
             )
             connection.send_result(msg["id"], {"success": True})
         except Exception as err:
@@ -190,17 +435,22 @@ def _register_websocket_handlers(hass: HomeAssistant) -> None:
     @websocket_api.websocket_command(
         {
             vol.Required("type"): WS_TOGGLE_CROSSED_OFF,
+            vol.Optional("entry_id"): str,
             vol.Required("list_id"): str,
             vol.Required("item_id"): str,
             vol.Required("cross_off"): bool,
         }
     )
     @websocket_api.async_response
+    @_metered
     async def ws_toggle_crossed_off(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            await api.toggle_crossed_off(
-                msg["list_id"], msg["item_id"], msg["cross_off"]
+            await coordinator.async_enqueue(
+                "toggle_crossed_off",
+                list_id=msg["list_id"],
+                item_id=msg["item_id"],
+                cross_off=msg["cross_off"],
             )
             connection.send_result(msg["id"], {"success": True})
         except Exception as err:
@@ -211,27 +461,46 @@ def _register_websocket_handlers(hass: HomeAssistant) -> None:
     @websocket_api.websocket_command(
         {
             vol.Required("type"): WS_DELETE_CROSSED_OFF,
+            vol.Optional("entry_id"): str,
             vol.Required("list_id"): str,
         }
     )
     @websocket_api.async_response
+    @_metered
     async def ws_delete_crossed_off(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            await api.delete_crossed_off(msg["list_id"])
+            await coordinator.async_enqueue(
+                "delete_crossed_off", list_id=msg["list_id"]
+            )
             connection.send_result(msg["id"], {"success": True})
         except Exception as err:
             connection.send_error(
                 msg["id"], "delete_crossed_off_failed", str(err)
             )
 
-    @websocket_api.websocket_command({vol.Required("type"): WS_GET_CATEGORIES})
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_GET_CATEGORIES,
+            vol.Optional("entry_id"): str,
+            vol.Optional("hash"): str,
+        }
+    )
     @websocket_api.async_response
+    @_metered
     async def ws_get_categories(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            data = await api.get_categories()
-            connection.send_result(msg["id"], data)
+            categories = coordinator.categories
+            unchanged = bool(msg.get("hash")) and msg["hash"] == categories.get(
+                "hash"
+            )
+            coordinator.metrics.record_cache("categories_hash", unchanged)
+            if unchanged:
+                categories = {"hash": msg["hash"], "unchanged": True}
+            connection.send_result(
+                msg["id"], _mark_stale(coordinator, categories)
+            )
         except Exception as err:
             connection.send_error(
                 msg["id"], "get_categories_failed", str(err)
@@ -240,16 +509,18 @@ def _register_websocket_handlers(hass: HomeAssistant) -> None:
     @websocket_api.websocket_command(
         {
             vol.Required("type"): WS_SET_ITEM_CATEGORY,
+            vol.Optional("entry_id"): str,
             vol.Required("item_name"): str,
             vol.Required("category_name"): str,
             vol.Optional("list_id", default=""): str,
         }
     )
     @websocket_api.async_response
+    @_metered
     async def ws_set_item_category(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            await api.set_item_category(
+            await coordinator.async_set_item_category(
                 msg["item_name"],
                 msg["category_name"],
                 msg.get("list_id", ""),
@@ -260,21 +531,254 @@ def _register_websocket_handlers(hass: HomeAssistant) -> None:
                 msg["id"], "set_item_category_failed", str(err)
             )
 
-    @websocket_api.websocket_command({vol.Required("type"): WS_GET_ITEM_LIST_MAP})
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_GET_ITEM_LIST_MAP,
+            vol.Optional("entry_id"): str,
+        }
+    )
     @websocket_api.async_response
+    @_metered
     async def ws_get_item_list_map(hass, connection, msg):
-        api = _get_api(hass)
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
         try:
-            data = await api.get_item_list_map()
+            data = await coordinator.async_get_item_list_map()
             connection.send_result(msg["id"], data)
         except Exception as err:
             connection.send_error(
                 msg["id"], "get_item_list_map_failed", str(err)
             )
 
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_BATCH,
+            vol.Optional("entry_id"): str,
+            vol.Required("operations"): [BATCH_OPERATION_SCHEMA],
+            vol.Optional("concurrency", default=BATCH_CONCURRENCY): vol.All(
+                int, vol.Range(min=1, max=MAX_BATCH_CONCURRENCY)
+            ),
+        }
+    )
+    @websocket_api.async_response
+    @_metered
+    async def ws_batch(hass, connection, msg):
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        try:
+            results = await coordinator.async_run_batch(
+                msg["operations"], msg["concurrency"]
+            )
+            connection.send_result(msg["id"], {"results": results})
+        except Exception as err:
+            connection.send_error(msg["id"], "batch_failed", str(err))
+
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_SUBSCRIBE,
+            vol.Optional("entry_id"): str,
+        }
+    )
+    @callback
+    @_metered
+    def ws_subscribe(hass, connection, msg):
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
+
+        @callback
+        def forward(event: dict) -> None:
+            connection.send_message(
+                websocket_api.event_message(msg["id"], event)
+            )
+
+        connection.subscriptions[msg["id"]] = coordinator.async_subscribe(
+            forward
+        )
+        connection.send_result(msg["id"])
+
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_SEARCH_ITEMS,
+            vol.Optional("entry_id"): str,
+            vol.Required("query"): str,
+            vol.Optional("limit", default=SEARCH_LIMIT): vol.All(
+                int, vol.Range(min=1, max=MAX_SEARCH_LIMIT)
+            ),
+            vol.Optional("list_id", default=""): str,
+        }
+    )
+    @websocket_api.async_response
+    @_metered
+    async def ws_search_items(hass, connection, msg):
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        try:
+            items = await coordinator.async_search_items(
+                msg["query"], msg["limit"], msg["list_id"]
+            )
+            connection.send_result(msg["id"], {"items": items})
+        except Exception as err:
+            connection.send_error(msg["id"], "search_items_failed", str(err))
+
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_IMPORT_ITEMS,
+            vol.Optional("entry_id"): str,
+            vol.Required("list_id"): str,
+            vol.Required("text"): str,
+            vol.Optional("concurrency", default=BATCH_CONCURRENCY): vol.All(
+                int, vol.Range(min=1, max=MAX_BATCH_CONCURRENCY)
+            ),
+        }
+    )
+    @websocket_api.async_response
+    @_metered
+    async def ws_import_items(hass, connection, msg):
+        """Import pasted lines into a list, streaming progress.
+
+        The result lists every distinct item with the action taken for it
+        ("skip", "uncross" or "add").  A "progress" event follows as each
+        uncross or add completes, then a final "done" event.
+        """
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        try:
+            plan = await coordinator.async_plan_import(
+                msg["list_id"], msg["text"]
+            )
+        except Exception as err:
+            connection.send_error(msg["id"], "import_items_failed", str(err))
+            return
+
+        actions = {"add_item": "add", "toggle_crossed_off": "uncross"}
+        steps = [(name, op) for name, op in plan if op is not None]
+        # Subscription-style: the import keeps running if the client
+        # unsubscribes or disconnects.
+        connection.subscriptions[msg["id"]] = lambda: None
+        connection.send_result(
+            msg["id"],
+            {
+                "items": [
+                    {"name": name, "action": actions[op["op"]] if op else "skip"}
+                    for name, op in plan
+                ],
+            },
+        )
+        done = 0
+
+        @callback
+        def on_result(pos: int, result: dict) -> None:
+            nonlocal done
+            done += 1
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {
+                        "type": "progress",
+                        "name": steps[pos][0],
+                        "done": done,
+                        "total": len(steps),
+                        **result,
+                    },
+                )
+            )
+
+        results = await coordinator.async_run_batch(
+            [op for _, op in steps], msg["concurrency"], on_result
+        )
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {
+                    "type": "done",
+                    "succeeded": sum(r["success"] for r in results),
+                    "skipped": len(plan) - len(steps),
+                    "failed": [
+                        steps[pos][0]
+                        for pos, r in enumerate(results)
+                        if not r["success"]
+                    ],
+                },
+            )
+        )
+
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_MOVE_ITEMS,
+            vol.Optional("entry_id"): str,
+            vol.Required("source_list_id"): str,
+            vol.Required("destination_list_id"): str,
+            vol.Required("item_ids"): [str],
+            vol.Optional("concurrency", default=BATCH_CONCURRENCY): vol.All(
+                int, vol.Range(min=1, max=MAX_BATCH_CONCURRENCY)
+            ),
+        }
+    )
+    @websocket_api.async_response
+    @_metered
+    async def ws_move_items(hass, connection, msg):
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        try:
+            results = await coordinator.async_transfer_items(
+                msg["source_list_id"],
+                msg["destination_list_id"],
+                msg["item_ids"],
+                True,
+                msg["concurrency"],
+            )
+            connection.send_result(msg["id"], {"results": results})
+        except Exception as err:
+            connection.send_error(msg["id"], "move_items_failed", str(err))
+
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_COPY_ITEMS,
+            vol.Optional("entry_id"): str,
+            vol.Required("source_list_id"): str,
+            vol.Required("destination_list_id"): str,
+            vol.Required("item_ids"): [str],
+            vol.Optional("concurrency", default=BATCH_CONCURRENCY): vol.All(
+                int, vol.Range(min=1, max=MAX_BATCH_CONCURRENCY)
+            ),
+        }
+    )
+    @websocket_api.async_response
+    @_metered
+    async def ws_copy_items(hass, connection, msg):
+        coordinator = _get_coordinator(hass, msg.get("entry_id"))
+        try:
+            results = await coordinator.async_transfer_items(
+                msg["source_list_id"],
+                msg["destination_list_id"],
+                msg["item_ids"],
+                False,
+                msg["concurrency"],
+            )
+            connection.send_result(msg["id"], {"results": results})
+        except Exception as err:
+            connection.send_error(msg["id"], "copy_items_failed", str(err))
+
+    # Not metered: reading traces is neither kiosk activity nor worth tracing
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): WS_GET_TRACES,
+            vol.Optional("entry_id"): str,
+            vol.Optional("clear", default=False): bool,
+        }
+    )
+    @websocket_api.require_admin
+    @callback
+    def ws_get_traces(hass, connection, msg):
+        try:
+            coordinator = _get_coordinator(hass, msg.get("entry_id"))
+            tracer = coordinator.tracer
+            connection.send_result(
+                msg["id"], {"enabled": tracer.enabled, "traces": tracer.as_list()}
+            )
+            if msg["clear"]:
+                tracer.clear()
+        except Exception as err:
+            connection.send_error(msg["id"], "get_traces_failed", str(err))
+
     # Register all handlers
     websocket_api.async_register_command(hass, ws_get_lists)
     websocket_api.async_register_command(hass, ws_get_list_items)
+    websocket_api.async_register_command(hass, ws_get_list_view)
     websocket_api.async_register_command(hass, ws_add_item)
     websocket_api.async_register_command(hass, ws_remove_item)
     websocket_api.async_register_command(hass, ws_update_item)
@@ -283,3 +787,10 @@ def _register_websocket_handlers(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, ws_get_categories)
     websocket_api.async_register_command(hass, ws_set_item_category)
     websocket_api.async_register_command(hass, ws_get_item_list_map)
+    websocket_api.async_register_command(hass, ws_subscribe)
+    websocket_api.async_register_command(hass, ws_batch)
+    websocket_api.async_register_command(hass, ws_search_items)
+    websocket_api.async_register_command(hass, ws_import_items)
+    websocket_api.async_register_command(hass, ws_move_items)
+    websocket_api.async_register_command(hass, ws_copy_items)
+    websocket_api.async_register_command(hass, ws_get_traces)
@@ -1,72 +1,634 @@
 """Async OurGroceries API client wrapper."""
 
 import asyncio
+import contextlib
+import hashlib
+import heapq
+import itertools
+import json
 import logging
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextvars import ContextVar
+from enum import IntEnum
 from functools import wraps
 from typing import Any, Callable, Coroutine
 
+import aiohttp
 import ourgroceries as og
+from ourgroceries.exceptions import InvalidLoginException
+
+from . import tracing
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    REQUEST_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    UPSTREAM_CONCURRENCY,
+)
+from .metrics import Metrics
+from .model import ItemList, build_list, normalize_name
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _auto_reauth(func: Callable[..., Coroutine[Any, Any, Any]]):
-    """Decorator that retries an API call once after re-authenticating.
+# How _retry_policy treats a failed call
+_AUTH = "auth"
+_TRANSIENT = "transient"
+_FATAL = "fatal"
 
-    The OurGroceries session cookie can expire server-side at any time.
-    When that happens, the library raises an exception (e.g. JSON decode
-    error on the HTML login redirect).  This decorator catches the first
-    failure, forces a fresh login, and retries the call exactly once.
+
+class UpstreamUnavailable(Exception):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(
+            f"OurGroceries is unavailable, retrying in {retry_after:.0f}s"
+        )
+        self.retry_after = retry_after
+
+
+def _classify(err: Exception) -> str:
+    """Decide how a failed upstream call should be handled.
+
+    An expired session makes OurGroceries answer with its HTML sign-in
+    page, which the library fails to decode as JSON.  Connection problems,
+    timeouts, rate limiting and server errors are transient.  Rejected
+    credentials are fatal.  Anything else is assumed to be a session
+    problem, which costs at most one re-login.
+    """
+    if isinstance(err, InvalidLoginException):
+        return _FATAL
+    if isinstance(err, aiohttp.ClientResponseError):
+        if err.status >= 500 or err.status == 429:
+            return _TRANSIENT
+        return _AUTH
+    if isinstance(err, (aiohttp.ClientError, TimeoutError)):
+        return _TRANSIENT
+    return _AUTH
+
+
+def is_transient(err: Exception) -> bool:
+    """Return True if a failed call may succeed when simply tried again."""
+    return _classify(err) == _TRANSIENT
+
+
+def _may_have_applied(err: Exception) -> bool:
+    """Whether a call that failed transiently may still have taken effect.
+
+    Only a connection that could not be opened, or a rate-limited request,
+    is known not to have reached OurGroceries.  A timeout or server error
+    may have come after the change was made.
+    """
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status != 429
+    return not isinstance(err, aiohttp.ClientConnectorError)
+
+
+class _CircuitBreaker:
+    """Stops calling upstream for a while after repeated transient failures.
+
+    Once open, calls fail immediately with UpstreamUnavailable until the
+    cooldown has passed; then a single trial call is let through, which
+    closes the breaker on success or re-opens it on failure.
+    """
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    def before_call(self) -> bool:
+        """Raise UpstreamUnavailable while open; return whether this is the trial."""
+        if self._opened_at is None:
+            return False
+        remaining = self._opened_at + self._cooldown - time.monotonic()
+        if remaining > 0 or self._trial:
+            raise UpstreamUnavailable(max(remaining, 1.0))
+        self._trial = True
+        return True
+
+    def end_trial(self) -> None:
+        """Let the next call through if the trial ended without a verdict.
+
+        A trial that fails on the session or credentials, or is cancelled,
+        says nothing about whether upstream is reachable.
+        """
+        self._trial = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            _LOGGER.info("OurGroceries is reachable again")
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial = False
+        if self._failures >= self._threshold:
+            if self._opened_at is None:
+                _LOGGER.warning(
+                    "OurGroceries unreachable after %d failed calls, "
+                    "pausing requests for %ds",
+                    self._failures, self._cooldown,
+                )
+            self._opened_at = time.monotonic()
+
+
+class Priority(IntEnum):
+    """Upstream request classes, most urgent first."""
+
+    # Writes a user just made
+    INTERACTIVE = 0
+    # Reads a kiosk is waiting on
+    FOREGROUND = 1
+    # Refreshes nobody is waiting on
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "ourgroceries_priority", default=Priority.FOREGROUND
+)
+
+
+@contextlib.contextmanager
+def upstream_priority(priority: Priority) -> Iterator[None]:
+    """Run the upstream reads made in this block at ``priority``.
+
+    Tasks started inside the block inherit it.  Writes always run at
+    INTERACTIVE priority.
     """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _UpstreamScheduler:
+    """Bounds concurrent upstream calls and admits waiting ones by priority.
+
+    Background calls may only use ``limit - 1`` slots, so there is always
+    room for a user's request once the calls ahead of it finish.  A
+    waiting call can be promoted when a more urgent caller starts waiting
+    on its result.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._active = 0
+        # [priority, sequence, future] entries, ordered as a heap
+        self._queue: list[list] = []
+        self._waiting: dict[asyncio.Task, list] = {}
+        self._sequence = itertools.count()
+
+    def _has_room(self, priority: Priority) -> bool:
+        limit = self._limit
+        if priority == Priority.BACKGROUND and limit > 1:
+            limit -= 1
+        return self._active < limit
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[bool]:
+        """Hold an upstream slot; yields whether the call had to wait."""
+        waited = not self._has_room(priority) or bool(
+            self._queue and self._queue[0][0] <= priority
+        )
+        if waited:
+            future = asyncio.get_running_loop().create_future()
+            entry = [priority, next(self._sequence), future]
+            heapq.heappush(self._queue, entry)
+            task = asyncio.current_task()
+            self._waiting[task] = entry
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Cancelled right after being handed the slot
+                if not future.cancelled():
+                    self._release()
+                raise
+            finally:
+                self._waiting.pop(task, None)
+        else:
+            self._active += 1
+        try:
+            yield waited
+        finally:
+            self._release()
+
+    def promote(self, task: asyncio.Future, priority: Priority) -> None:
+        """Raise the priority of ``task`` if it is waiting for a slot."""
+        entry = self._waiting.get(task)
+        if entry is not None and priority < entry[0]:
+            entry[0] = priority
+            heapq.heapify(self._queue)
+            self._wake()
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._queue and self._has_room(self._queue[0][0]):
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                self._active += 1
+                future.set_result(None)
+
+
+def _retry_policy(func: Callable[..., Coroutine[Any, Any, Any]]):
+    """Decorator that retries an API call according to why it failed.
+
+    - Session expiry: force a fresh login and retry once.  Concurrent calls
+      that fail on the same expired session share a single re-login.
+    - Transient errors: retry with jittered exponential backoff, without
+      touching the session.  Calls that still fail count towards the
+      circuit breaker, which then fails further calls fast.  Calls marked
+      with _not_idempotent are not retried after an error that may have
+      come after the change was made, so it is never made twice.
+    - Fatal errors (bad credentials): raise immediately.
+
+    Each attempt holds an upstream slot at the caller's priority (see
+    upstream_priority), is bounded by REQUEST_TIMEOUT once it has one, and
+    is recorded in the metrics.  The call, with its retries, is one span of
+    the current trace.
+    """
+
+    idempotent = getattr(func, "idempotent", True)
 
     @wraps(func)
     async def wrapper(self: "OurGroceriesAPI", *args, **kwargs):
         try:
-            return await func(self, *args, **kwargs)
-        except Exception as first_err:
-            _LOGGER.debug(
-                "OurGroceries call %s failed (%s), re-authenticating",
-                func.__name__,
-                first_err,
+            trial = self._breaker.before_call()
+        except UpstreamUnavailable:
+            self.metrics.count("breaker_rejections")
+            raise
+        priority = _priority.get()
+        try:
+            with tracing.span(func.__name__, priority=priority.name.lower()):
+                return await _call(self, priority, *args, **kwargs)
+        finally:
+            if trial:
+                self._breaker.end_trial()
+
+    async def _call(self: "OurGroceriesAPI", priority: Priority, *args, **kwargs):
+        relogged_in = False
+        attempt = 0
+        while True:
+            session: int | None = None
+            start = time.monotonic()
+            try:
+                async with self._scheduler.slot(priority) as waited:
+                    if waited:
+                        self.metrics.count(f"queued_{priority.name.lower()}")
+                        tracing.event(
+                            "queued",
+                            wait_ms=round((time.monotonic() - start) * 1000, 1),
+                        )
+                    start = time.monotonic()
+                    async with asyncio.timeout(REQUEST_TIMEOUT):
+                        await self._ensure_login()
+                        session = self._session
+                        result = await func(self, *args, **kwargs)
+            except Exception as err:
+                self.metrics.record_upstream(
+                    func.__name__, time.monotonic() - start, True
+                )
+                kind = _classify(err)
+                if kind == _TRANSIENT:
+                    attempt += 1
+                    if attempt >= RETRY_ATTEMPTS or (
+                        not idempotent and _may_have_applied(err)
+                    ):
+                        self._breaker.record_failure()
+                        raise
+                    self.metrics.count("retries")
+                    delay = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+                    _LOGGER.debug(
+                        "OurGroceries call %s failed (%s), retrying in %.1fs",
+                        func.__name__, tracing.describe(err), delay,
+                    )
+                    tracing.event(
+                        "retry",
+                        error=err,
+                        delay_ms=round(delay * 1000),
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                if kind == _FATAL or relogged_in:
+                    raise
+                _LOGGER.debug(
+                    "OurGroceries call %s failed (%s), re-authenticating",
+                    func.__name__, tracing.describe(err),
+                )
+                relogged_in = True
+                tracing.event("relogin", error=err)
+                try:
+                    await self._force_relogin(session)
+                except Exception as login_err:
+                    if _classify(login_err) == _TRANSIENT:
+                        self._breaker.record_failure()
+                    raise
+                continue
+            self.metrics.record_upstream(
+                func.__name__, time.monotonic() - start, False
             )
-            await self._force_relogin()
+            self._breaker.record_success()
+            return result
+
+    return wrapper
+
+
+def _not_idempotent(func: Callable[..., Coroutine[Any, Any, Any]]):
+    """Mark a write that must not be repeated blindly; see _retry_policy."""
+    func.idempotent = False
+    return func
+
+
+def _interactive(func: Callable[..., Coroutine[Any, Any, Any]]):
+    """Decorator that runs a write at INTERACTIVE priority."""
+
+    @wraps(func)
+    async def wrapper(self: "OurGroceriesAPI", *args, **kwargs):
+        with upstream_priority(Priority.INTERACTIVE):
             return await func(self, *args, **kwargs)
 
     return wrapper
 
 
+def _single_flight(func: Callable[..., Coroutine[Any, Any, Any]]):
+    """Decorator that shares one in-flight read among identical callers.
+
+    While a call with the same method and arguments is already running,
+    later callers await its result instead of issuing their own upstream
+    request.  A caller more urgent than the one that started the call
+    promotes it.  The shared result must be treated as read-only.  Writes
+    take the reads they may have outdated out of ``_inflight`` (see
+    _list_written), so later callers start a fresh one.
+    """
+
+    @wraps(func)
+    async def wrapper(self: "OurGroceriesAPI", *args):
+        key = (func.__name__, *args)
+        task = self._inflight.get(key)
+        self.metrics.record_cache("single_flight", task is not None)
+        if task is None:
+            task = asyncio.ensure_future(func(self, *args))
+            self._inflight[key] = task
+
+            def _done(_: asyncio.Future) -> None:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+            task.add_done_callback(_done)
+        else:
+            self._scheduler.promote(task, _priority.get())
+            tracing.event("single_flight_shared", call=func.__name__)
+        # Shielded so one caller being cancelled doesn't cancel the others
+        return await asyncio.shield(task)
+
+    return wrapper
+
+
+def _content_version(items: list[dict]) -> str:
+    """Return a stable hash of parsed items for use as a list version."""
+    payload = json.dumps(items, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+class _PooledClient(og.OurGroceries):
+    """ourgroceries client that sends every request over one HTTP session.
+
+    The library opens a new aiohttp session, and with it a new connection
+    and TLS handshake, for every request.  This keeps its commands but
+    routes them through ``http``, whose cookie jar holds the login and
+    whose connections are pooled and kept alive.  Logging in also fetches
+    the lists page once instead of twice.  It overrides the library's
+    private methods, so manifest.json pins the library version.
+
+    Every HTTP request is counted in ``metrics``, which is what the
+    request budget is measured in.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        http: aiohttp.ClientSession,
+        metrics: Metrics,
+    ) -> None:
+        super().__init__(username, password)
+        self._http = http
+        self._metrics = metrics
+
+    @contextlib.asynccontextmanager
+    async def _request(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send one HTTP request over the pooled session and count it."""
+        error = True
+        try:
+            async with self._http.request(method, url, **kwargs) as resp:
+                error = resp.status >= 400
+                yield resp
+        finally:
+            self._metrics.record_request(error)
+
+    async def login(self) -> None:
+        await self._get_session_cookie()
+        await self._get_account_ids()
+
+    async def _get_session_cookie(self) -> None:
+        self._session_key = None
+        self._http.cookie_jar.clear()
+        form_data = aiohttp.FormData()
+        form_data.add_field(og.FORM_KEY_USERNAME, self._username)
+        form_data.add_field(og.FORM_KEY_PASSWORD, self._password)
+        form_data.add_field(og.FORM_KEY_ACTION, og.FORM_VALUE_ACTION)
+        with tracing.span("sign-in") as span:
+            async with self._request("POST", og.SIGN_IN, data=form_data) as resp:
+                cookies = self._http.cookie_jar.filter_cookies(og.BASE_URL)
+                if span is not None:
+                    span.attrs["status"] = resp.status
+        cookie = cookies.get(og.COOKIE_KEY_SESSION)
+        if cookie is None:
+            raise InvalidLoginException("Could not find session cookie")
+        self._session_key = cookie.value
+
+    async def _get_account_ids(self) -> None:
+        """Scrape the team, category list and master list ids."""
+        with tracing.span("your-lists page") as span:
+            async with self._request("GET", og.YOUR_LISTS) as resp:
+                page = await resp.text()
+            if span is not None:
+                span.attrs.update(status=resp.status, response_bytes=len(page))
+        self._team_id = re.findall(og.REGEX_TEAM_ID, page)[0]
+        metalist = json.loads(re.findall(og.REGEX_STATIC_METALIST, page)[0])
+        self._category_id = next(
+            lst["id"] for lst in metalist if lst["listType"] == "CATEGORY"
+        )
+        self._master_list_id = re.findall(og.REGEX_MASTER_LIST_ID, page)[0]
+
+    async def _post(self, command: str, other_payload: dict | None = None):
+        if not self._session_key:
+            await self.login()
+        payload = {og.ATTR_COMMAND: command}
+        if self._team_id:
+            payload[og.ATTR_TEAM_ID] = self._team_id
+        if other_payload:
+            payload.update(other_payload)
+        with tracing.span(command) as span:
+            async with self._request("POST", og.YOUR_LISTS, json=payload) as resp:
+                data = await resp.json()
+                if span is not None:
+                    span.attrs.update(
+                        status=resp.status,
+                        request_bytes=len(json.dumps(payload)),
+                        response_bytes=len(await resp.read()),
+                    )
+            return data
+
+
 class OurGroceriesAPI:
-    """Wraps the ourgroceries library with a persistent session."""
+    """Wraps the ourgroceries library with a persistent session.
+
+    Given an aiohttp ``session``, all requests go through it; it must not
+    be shared with other accounts, since it holds the login cookie.
+    Without one, the library opens its own session per request, and those
+    requests are not counted in the metrics.
+    """
 
-    def __init__(self, username: str, password: str) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        metrics: Metrics | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
         self._username = username
         self._password = password
+        self.metrics = metrics or Metrics()
+        self.tracer = tracing.Tracer()
+        self._http = session
         self._client: og.OurGroceries | None = None
         self._logged_in = False
+        # Serializes session (re)creation; _session counts logins so a
+        # failed call can tell whether someone already replaced its session.
+        self._login_lock = asyncio.Lock()
+        self._session = 0
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._breaker = _CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+        self._scheduler = _UpstreamScheduler(UPSTREAM_CONCURRENCY)
+        # Records of the last fetched category, master and shopping lists,
+        # which set_item_category resolves names through.  They are
+        # refreshed by every read of the payload they come from, so the
+        # coordinator's regular refresh keeps them warm.
+        self._category_list: ItemList | None = None
+        self._master: ItemList | None = None
+        self._lists: dict[str, ItemList] = {}
+        # Upstream versions of the category and master lists, and the
+        # categories payload derived from them
+        self._categories_key: tuple[str, str] | None = None
+        self._categories_payload: dict = {}
 
     async def _ensure_login(self) -> og.OurGroceries:
         if self._client is None or not self._logged_in:
-            self._client = og.OurGroceries(self._username, self._password)
-            await self._client.login()
-            self._logged_in = True
+            async with self._login_lock:
+                if self._client is None or not self._logged_in:
+                    await self._login()
         return self._client
 
-    async def _force_relogin(self) -> None:
-        """Drop the current session and create a fresh one."""
-        _LOGGER.info("OurGroceries: forcing fresh login")
-        self._client = og.OurGroceries(self._username, self._password)
-        await self._client.login()
+    async def _force_relogin(self, failed_session: int | None) -> None:
+        """Drop the current session and create a fresh one.
+
+        ``failed_session`` is the session the caller's failed attempt ran
+        on (None if it failed logging in).  If another caller has logged in
+        since, that login is reused.
+        """
+        async with self._login_lock:
+            if self._session != failed_session and self._logged_in:
+                return
+            _LOGGER.info("OurGroceries: forcing fresh login")
+            self.metrics.count("relogins")
+            # A failed call may have acted on a stale cached id; start over.
+            self._drop_lookup_caches()
+            await self._login()
+
+    async def _login(self) -> None:
+        """Create and log in a new client.  Caller holds the login lock."""
+        self._logged_in = False
+        if self._http is None:
+            client = og.OurGroceries(self._username, self._password)
+        else:
+            client = _PooledClient(
+                self._username, self._password, self._http, self.metrics
+            )
+        start = time.monotonic()
+        try:
+            with tracing.span("login"):
+                await client.login()
+        except Exception:
+            self.metrics.record_upstream("login", time.monotonic() - start, True)
+            raise
+        self.metrics.record_upstream("login", time.monotonic() - start, False)
+        self._client = client
         self._logged_in = True
+        self._session += 1
+
+    def _drop_lookup_caches(self) -> None:
+        self._category_list = None
+        self._master = None
+        self._lists.clear()
+
+    def _list_written(self, list_id: str) -> None:
+        """Forget what is known of a list after writing to it.
+
+        Besides its records, reads of the list and of the list overview
+        that were already running are dropped from single-flight: they may
+        return the list as it was before the write.
+        """
+        self._lists.pop(list_id, None)
+        self._inflight.pop(("get_list", list_id), None)
+        self._inflight.pop(("get_lists",), None)
+
+    def _build(self, data: dict, previous: ItemList | None) -> ItemList:
+        record, reused = build_list(data.get("list", {}), previous)
+        self.metrics.record_cache("list_records", reused)
+        return record
+
+    async def _load_categories(self, client: og.OurGroceries) -> ItemList:
+        """Fetch the category list and refresh its records."""
+        data = await client.get_category_items()
+        self._category_list = self._build(data, self._category_list)
+        return self._category_list
+
+    async def _load_master(self, client: og.OurGroceries) -> ItemList:
+        """Fetch the master list and refresh its records."""
+        data = await client.get_master_list()
+        self._master = self._build(data, self._master)
+        return self._master
+
+    async def _load_list(self, client: og.OurGroceries, list_id: str) -> ItemList:
+        """Fetch a list and refresh its records."""
+        data = await client.get_list_items(list_id)
+        record = self._build(data, self._lists.get(list_id))
+        self._lists[list_id] = record
+        return record
 
     async def validate_credentials(self) -> bool:
         """Test login. Returns True on success, raises on failure."""
-        client = og.OurGroceries(self._username, self._password)
-        await client.login()
-        self._client = client
-        self._logged_in = True
+        async with self._login_lock:
+            await self._login()
         return True
 
-    @_auto_reauth
+    @_single_flight
+    @_retry_policy
     async def get_lists(self) -> list[dict]:
         """Return all shopping lists with name, id, and active item count."""
         client = await self._ensure_login()
@@ -78,178 +640,196 @@ class OurGroceriesAPI:
                 "id": sl.get("id", ""),
                 "name": sl.get("name", ""),
                 "item_count": sl.get("activeCount", sl.get("itemCount", 0)),
+                "version": sl.get("versionId", ""),
             })
         return result
 
-    @_auto_reauth
+    @_single_flight
+    @_retry_policy
+    async def get_list(self, list_id: str) -> dict:
+        """Return a list's version identifier and its items.
+
+        OurGroceries bumps ``versionId`` on every change to a list.  If the
+        payload ever lacks it, a hash of the items stands in so callers can
+        still compare versions.
+        """
+        client = await self._ensure_login()
+        record = await self._load_list(client, list_id)
+        items = record.as_dicts()
+        version = record.version or _content_version(items)
+        return {"version": version, "items": items}
+
     async def get_list_items(self, list_id: str) -> list[dict]:
         """Return items for a specific list."""
-        client = await self._ensure_login()
-        data = await client.get_list_items(list_id)
-        items = data.get("list", {}).get("items", [])
-        result = []
-        for item in items:
-            # The OurGroceries API no longer returns a boolean "crossedOff".
-            # Instead, crossed-off items have a "crossedOffAt" timestamp.
-            # Fall back to the legacy "crossedOff" field if present.
-            crossed = bool(
-                item.get("crossedOff")
-                or item.get("crossedOffAt")
-            )
-            result.append({
-                "id": item.get("id", ""),
-                "name": item.get("value", ""),
-                "crossed_off": crossed,
-                "crossed_off_at": item.get("crossedOffAt", 0),
-                "category_id": item.get("categoryId", ""),
-                "note": item.get("note", ""),
-            })
-        return result
+        return (await self.get_list(list_id))["items"]
 
-    @_auto_reauth
-    async def add_item(self, list_id: str, name: str) -> None:
-        """Add an item to a list."""
+    @_interactive
+    @_retry_policy
+    @_not_idempotent
+    async def add_item(
+        self, list_id: str, name: str, category_id: str = "", note: str = ""
+    ) -> None:
+        """Add an item to a list.
+
+        Without a ``category_id``, OurGroceries picks the category.  Sending
+        it twice adds the item twice, so it is not retried after a timeout
+        or server error; the caller has to check the list first.
+        """
         client = await self._ensure_login()
-        await client.add_item_to_list(list_id, name, auto_category=True)
+        if category_id:
+            await client.add_item_to_list(
+                list_id, name, category=category_id, note=note or None
+            )
+        else:
+            await client.add_item_to_list(
+                list_id, name, auto_category=True, note=note or None
+            )
+        self._list_written(list_id)
 
-    @_auto_reauth
+    @_interactive
+    @_retry_policy
     async def remove_item(self, list_id: str, item_id: str) -> None:
         """Remove an item from a list."""
         client = await self._ensure_login()
         await client.remove_item_from_list(list_id, item_id)
+        self._list_written(list_id)
 
-    @_auto_reauth
+    @_interactive
+    @_retry_policy
     async def update_item(
         self, list_id: str, item_id: str, name: str, category_id: str = ""
     ) -> None:
         """Rename an item (and optionally change its category)."""
         client = await self._ensure_login()
         await client.change_item_on_list(list_id, item_id, category_id, name)
+        self._list_written(list_id)
 
-    @_auto_reauth
+    @_interactive
+    @_retry_policy
     async def toggle_crossed_off(
         self, list_id: str, item_id: str, cross_off: bool
     ) -> None:
         """Toggle the crossed-off state of an item."""
         client = await self._ensure_login()
         await client.toggle_item_crossed_off(list_id, item_id, cross_off)
+        self._list_written(list_id)
 
-    @_auto_reauth
+    @_interactive
+    @_retry_policy
     async def delete_crossed_off(self, list_id: str) -> None:
         """Delete all crossed-off items from a list."""
         client = await self._ensure_login()
         await client.delete_all_crossed_off_from_list(list_id)
+        self._list_written(list_id)
 
-    @_auto_reauth
+    @_single_flight
+    @_retry_policy
     async def get_categories(self) -> dict:
-        """Return category mapping and master list item categories."""
+        """Return category mapping and master list item categories.
+
+        The derived payload is rebuilt only when the upstream version of
+        the category or master list moved; otherwise the previous payload
+        is returned as is.  Its ``hash`` identifies the content.
+        """
         client = await self._ensure_login()
 
         # Get category id -> name mapping
-        cat_data = await client.get_category_items()
-        cat_items = cat_data.get("list", {}).get("items", [])
-        cat_map = {c["id"]: c["value"] for c in cat_items}
-        all_categories = sorted(cat_map.values(), key=str.lower)
-
+        category_list = await self._load_categories(client)
         # Get master list for item -> category mapping
-        master = await client.get_master_list()
-        master_items = master.get("list", {}).get("items", [])
+        master = await self._load_master(client)
 
-        master_categories = {}
-        for item in master_items:
-            cat_id = item.get("categoryId", "")
-            if cat_id and cat_id in cat_map:
-                name = item.get("value", "").strip().lower()
-                if name:
-                    master_categories[name] = cat_map[cat_id]
+        key = (category_list.version, master.version)
+        reuse = all(key) and key == self._categories_key
+        self.metrics.record_cache("categories_payload", reuse)
+        if reuse:
+            return self._categories_payload
+
+        cat_map = {c.id: c.name for c in category_list.items}
+        all_categories = sorted(cat_map.values(), key=str.lower)
+
+        master_categories = {
+            item.key: cat_map[item.category_id]
+            for item in master.items
+            if item.key and item.category_id in cat_map
+        }
 
         master_item_names = [
-            {"name": item.get("value", ""), "added_count": item.get("addedCount", 0)}
-            for item in master_items
-            if item.get("value", "").strip()
+            {"name": item.name, "added_count": item.added_count}
+            for item in master.items
+            if item.key
         ]
 
-        return {
+        payload = {
             "categories": all_categories,
             "master_categories": master_categories,
             "category_id_map": cat_map,
             "category_name_to_id": {v.lower(): k for k, v in cat_map.items()},
             "master_items": master_item_names,
         }
+        payload["hash"] = _content_version(payload)
+        self._categories_key = key
+        self._categories_payload = payload
+        return payload
 
-    @_auto_reauth
-    async def get_item_list_map(self) -> dict:
-        """Return a map of lowercase item names to lists they appear on.
-
-        Only includes non-crossed-off items.
-        """
-        client = await self._ensure_login()
-        data = await client.get_my_lists()
-        lists = data.get("shoppingLists", [])
-
-        valid = [(sl["id"], sl.get("name", "")) for sl in lists if sl.get("id")]
-        results = await asyncio.gather(
-            *(client.get_list_items(lid) for lid, _ in valid)
-        )
-
-        item_map: dict[str, list[str]] = {}
-        for (_, list_name), list_data in zip(valid, results):
-            items = list_data.get("list", {}).get("items", [])
-            for item in items:
-                if item.get("crossedOff") or item.get("crossedOffAt"):
-                    continue
-                name = item.get("value", "").strip().lower()
-                if name:
-                    item_map.setdefault(name, [])
-                    if list_name not in item_map[name]:
-                        item_map[name].append(list_name)
-
-        return item_map
-
-    @_auto_reauth
+    @_interactive
+    @_retry_policy
     async def set_item_category(
         self,
         item_name: str,
         category_name: str,
         list_id: str = "",
     ) -> None:
-        """Set category on master list and optionally on a shopping list."""
+        """Set category on master list and optionally on a shopping list.
+
+        Names are resolved through the cached lookups, so in the common case
+        this only performs the writes.  A cache miss re-fetches just the
+        payload that missed before giving up on the name.
+        """
         client = await self._ensure_login()
 
         # Resolve category name to ID
-        cat_data = await client.get_category_items()
-        cat_items = cat_data.get("list", {}).get("items", [])
-        cat_name_to_id = {c["value"].lower(): c["id"] for c in cat_items}
-
         category_id = ""
         if category_name:
-            category_id = cat_name_to_id.get(category_name.lower(), "")
-            if not category_id:
+            key = normalize_name(category_name)
+            categories = self._category_list
+            hit = categories is not None and key in categories.by_key
+            self.metrics.record_cache("name_lookup", hit)
+            if not hit:
+                categories = await self._load_categories(client)
+            category = categories.by_key.get(key)
+            if category is None or not category.id:
                 _LOGGER.warning("Category '%s' not found", category_name)
                 return
+            category_id = category.id
 
-        item_lower = item_name.strip().lower()
+        item_key = normalize_name(item_name)
 
         # Update master list
-        master = await client.get_master_list()
-        master_items = master.get("list", {}).get("items", [])
-        master_list_id = master.get("list", {}).get("id", "")
-
-        for mi in master_items:
-            if mi.get("value", "").strip().lower() == item_lower:
-                await client.change_item_on_list(
-                    master_list_id, mi["id"], category_id, mi["value"]
-                )
-                break
+        master = self._master
+        hit = master is not None and item_key in master.by_key
+        self.metrics.record_cache("name_lookup", hit)
+        if not hit:
+            master = await self._load_master(client)
+        mi = master.by_key.get(item_key)
+        if mi is not None:
+            await client.change_item_on_list(
+                master.id, mi.id, category_id, mi.name
+            )
+            mi.category_id = category_id
+            self._inflight.pop(("get_categories",), None)
 
         # Update shopping list if provided
         if list_id:
-            list_data = await client.get_list_items(list_id)
-            list_items = list_data.get("list", {}).get("items", [])
-
-            for li in list_items:
-                if li.get("value", "").strip().lower() == item_lower:
-                    await client.change_item_on_list(
-                        list_id, li["id"], category_id, li["value"]
-                    )
-                    break
+            record = self._lists.get(list_id)
+            hit = record is not None and item_key in record.by_key
+            self.metrics.record_cache("name_lookup", hit)
+            if not hit:
+                record = await self._load_list(client, list_id)
+            li = record.by_key.get(item_key)
+            if li is not None:
+                await client.change_item_on_list(
+                    list_id, li.id, category_id, li.name
+                )
+                li.category_id = category_id
+                # The records were updated in place; only drop older reads
+                self._inflight.pop(("get_list", list_id), None)
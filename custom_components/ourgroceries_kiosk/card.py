@@ -0,0 +1,105 @@
+"""Serving of the kiosk card's JavaScript bundle.
+
+The card is served at a URL stamped with a hash of its content, so
+browsers may cache it forever and pick up a new version as soon as the
+Lovelace resource points at a new hash.  Compressed variants are built
+once when the integration is set up.
+"""
+
+import gzip
+import hashlib
+import os
+from dataclasses import dataclass, field
+
+from aiohttp import hdrs, web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import CARD_CACHE_MAX_AGE, DOMAIN
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CARD_PATH = os.path.join(
+    os.path.dirname(__file__), "frontend", "ourgroceries-kiosk-card.js"
+)
+CARD_URL = f"/{DOMAIN}/ourgroceries-kiosk-card.js"
+
+
+@dataclass
+class CardBundle:
+    """The card's source, its version and its compressed variants."""
+
+    body: bytes
+    version: str
+    # Content-Encoding -> compressed body, preferred encoding first
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def url(self) -> str:
+        return f"{CARD_URL}?v={self.version}"
+
+
+def load_card_bundle(path: str = CARD_PATH) -> CardBundle:
+    """Read and compress the card.  Does blocking I/O."""
+    with open(path, "rb") as file:
+        body = file.read()
+    bundle = CardBundle(body, hashlib.sha256(body).hexdigest()[:12])
+    if brotli is not None:
+        bundle.encoded["br"] = brotli.compress(body, quality=11)
+    bundle.encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    return bundle
+
+
+class CardView(HomeAssistantView):
+    """Serve the card bundle, compressed when the browser accepts it.
+
+    Requests for the current version get immutable cache headers; any
+    other request must revalidate, using the version as ETag.
+    """
+
+    url = CARD_URL
+    name = f"{DOMAIN}:card"
+    requires_auth = False
+
+    def __init__(self, bundle: CardBundle) -> None:
+        self._bundle = bundle
+
+    async def get(self, request: web.Request) -> web.Response:
+        bundle = self._bundle
+        etag = f'"{bundle.version}"'
+        headers = {hdrs.ETAG: etag, hdrs.VARY: hdrs.ACCEPT_ENCODING}
+        if request.query.get("v") == bundle.version:
+            headers[hdrs.CACHE_CONTROL] = (
+                f"public, max-age={CARD_CACHE_MAX_AGE}, immutable"
+            )
+        else:
+            headers[hdrs.CACHE_CONTROL] = "no-cache"
+        if etag in request.headers.get(hdrs.IF_NONE_MATCH, ""):
+            return web.Response(status=304, headers=headers)
+
+        accepted = {
+            coding.split(";")[0].strip()
+            for coding in request.headers.get(hdrs.ACCEPT_ENCODING, "").split(",")
+        }
+        body = bundle.body
+        for encoding, encoded in bundle.encoded.items():
+            if encoding in accepted:
+                headers[hdrs.CONTENT_ENCODING] = encoding
+                body = encoded
+                break
+        return web.Response(
+            body=body,
+            content_type="text/javascript",
+            charset="utf-8",
+            headers=headers,
+        )
+
+
+async def async_register_card(hass: HomeAssistant) -> CardBundle:
+    """Build the card bundle and start serving it."""
+    bundle = await hass.async_add_executor_job(load_card_bundle)
+    hass.http.register_view(CardView(bundle))
+    return bundle
@@ -4,9 +4,18 @@ import logging
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .api import OurGroceriesAPI
-from .const import CONF_PASSWORD, CONF_USERNAME, DOMAIN
+from .const import (
+    CONF_PASSWORD,
+    CONF_REQUEST_BUDGET,
+    CONF_TRACING,
+    CONF_USERNAME,
+    DEFAULT_REQUEST_BUDGET,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,20 +34,31 @@ class OurGroceriesKioskConfigFlow(
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow handler."""
+        return OurGroceriesKioskOptionsFlow()
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step: username + password."""
         errors = {}
 
         if user_input is not None:
+            session = async_create_clientsession(self.hass, auto_cleanup=False)
             api = OurGroceriesAPI(
-                user_input[CONF_USERNAME], user_input[CONF_PASSWORD]
+                user_input[CONF_USERNAME],
+                user_input[CONF_PASSWORD],
+                session=session,
             )
             try:
                 await api.validate_credentials()
             except Exception:
                 _LOGGER.exception("Failed to authenticate with OurGroceries")
                 errors["base"] = "invalid_auth"
-            else:
+            finally:
+                session.detach()
+            if not errors:
                 # Prevent duplicate entries
                 await self.async_set_unique_id(user_input[CONF_USERNAME])
                 self._abort_if_unique_id_configured()
@@ -53,3 +73,28 @@ class OurGroceriesKioskConfigFlow(
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
         )
+
+
+class OurGroceriesKioskOptionsFlow(config_entries.OptionsFlow):
+    """Handle the integration options."""
+
+    async def async_step_init(self, user_input=None):
+        """Set the upstream request budget and request tracing."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        budget = self.config_entry.options.get(
+            CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+        )
+        tracing = self.config_entry.options.get(CONF_TRACING, False)
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_REQUEST_BUDGET, default=budget): vol.All(
+                        vol.Coerce(int), vol.Range(min=60, max=10000)
+                    ),
+                    vol.Required(CONF_TRACING, default=tracing): bool,
+                }
+            ),
+        )
@@ -3,10 +3,13 @@
 DOMAIN = "ourgroceries_kiosk"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
+CONF_REQUEST_BUDGET = "request_budget"
+CONF_TRACING = "tracing"
 
 # WebSocket command names
 WS_GET_LISTS = f"{DOMAIN}/get_lists"
 WS_GET_LIST_ITEMS = f"{DOMAIN}/get_list_items"
+WS_GET_LIST_VIEW = f"{DOMAIN}/get_list_view"
 WS_ADD_ITEM = f"{DOMAIN}/add_item"
 WS_REMOVE_ITEM = f"{DOMAIN}/remove_item"
 WS_UPDATE_ITEM = f"{DOMAIN}/update_item"
@@ -15,3 +18,85 @@ WS_DELETE_CROSSED_OFF = f"{DOMAIN}/delete_crossed_off"
 WS_GET_CATEGORIES = f"{DOMAIN}/get_categories"
 WS_SET_ITEM_CATEGORY = f"{DOMAIN}/set_item_category"
 WS_GET_ITEM_LIST_MAP = f"{DOMAIN}/get_item_list_map"
+WS_SUBSCRIBE = f"{DOMAIN}/subscribe"
+WS_BATCH = f"{DOMAIN}/batch"
+WS_SEARCH_ITEMS = f"{DOMAIN}/search_items"
+WS_IMPORT_ITEMS = f"{DOMAIN}/import_items"
+WS_MOVE_ITEMS = f"{DOMAIN}/move_items"
+WS_COPY_ITEMS = f"{DOMAIN}/copy_items"
+WS_GET_TRACES = f"{DOMAIN}/get_traces"
+
+# Seconds between full upstream refreshes (categories, master list and
+# every tracked list) while kiosks are in use
+UPDATE_INTERVAL = 30
+
+# Adaptive refresh: while a kiosk opened or changed a list within
+# ACTIVE_WINDOW seconds, the lists it views are polled every
+# ACTIVE_REFRESH_INTERVAL seconds.  Once idle, the interval doubles from
+# UPDATE_INTERVAL every IDLE_BACKOFF_STEP seconds up to IDLE_REFRESH_MAX.
+# Intervals vary by +/- REFRESH_JITTER, and polling stays within the
+# upstream request budget (requests per hour, configurable in the
+# integration options).
+ACTIVE_WINDOW = 120
+ACTIVE_REFRESH_INTERVAL = 5
+IDLE_BACKOFF_STEP = 600
+IDLE_REFRESH_MAX = 600
+REFRESH_JITTER = 0.1
+DEFAULT_REQUEST_BUDGET = 1800
+
+# Previous versions of each list kept for version-relative diffs
+LIST_HISTORY_SIZE = 5
+
+# Seconds between full re-fetches that reconcile the item-list index
+INDEX_RECONCILE_INTERVAL = 900
+
+# Most items a single import may contain
+MAX_IMPORT_ITEMS = 200
+
+# Write-behind mutation queue: storage schema, retry backoff bounds in
+# seconds, and attempts before a mutation is given up on
+QUEUE_STORAGE_VERSION = 1
+QUEUE_RETRY_MIN = 1
+QUEUE_RETRY_MAX = 300
+QUEUE_MAX_ATTEMPTS = 20
+
+# Upstream calls: per-attempt timeout in seconds, attempts and base backoff
+# in seconds for transient errors, and failed calls that open the circuit
+# breaker for BREAKER_COOLDOWN seconds
+REQUEST_TIMEOUT = 20
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60
+
+# Upstream calls in flight at once.  One slot is kept free of background
+# refreshes so a tap on a kiosk never waits for a bulk download to finish.
+UPSTREAM_CONCURRENCY = 4
+
+# Upstream calls a batch runs at once, by default and at most.  Batch calls
+# share the UPSTREAM_CONCURRENCY slots, so more would only queue up there.
+BATCH_CONCURRENCY = UPSTREAM_CONCURRENCY
+MAX_BATCH_CONCURRENCY = UPSTREAM_CONCURRENCY
+
+# Persisted snapshot served at startup: storage schema and seconds to
+# coalesce changes before writing it
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+
+# Master item search: results by default and at most, and the longest word
+# prefix indexed (longer queries are checked against that prefix's matches)
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+SEARCH_PREFIX_LENGTH = 3
+
+# Upper bounds in milliseconds of the latency histogram buckets
+METRICS_LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Seconds browsers may cache the version-stamped card bundle
+CARD_CACHE_MAX_AGE = 31536000
+
+# Request traces kept per account while tracing is enabled in the options
+TRACE_BUFFER_SIZE = 50
+
+# Group of the items that have no category, as the card labels it
+UNCATEGORIZED = "Uncategorized"
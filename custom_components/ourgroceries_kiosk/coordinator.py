@@ -0,0 +1,1013 @@
+"""Shared data coordinator for the OurGroceries Kiosk integration.
+
+One coordinator exists per config entry.  It owns the only refresh cycle
+that talks to OurGroceries and keeps an in-memory snapshot that every
+WebSocket handler serves from, so upstream traffic does not grow with the
+number of connected kiosks.  Changes are detected once, here, and pushed
+to subscribed clients as item-level deltas.  The snapshot is persisted
+so it can be served straight after a restart while a refresh catches up.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .api import OurGroceriesAPI, Priority, upstream_priority
+from .const import (
+    ACTIVE_REFRESH_INTERVAL,
+    ACTIVE_WINDOW,
+    CONF_REQUEST_BUDGET,
+    DEFAULT_REQUEST_BUDGET,
+    DOMAIN,
+    IDLE_BACKOFF_STEP,
+    IDLE_REFRESH_MAX,
+    INDEX_RECONCILE_INTERVAL,
+    LIST_HISTORY_SIZE,
+    MAX_IMPORT_ITEMS,
+    REFRESH_JITTER,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+    UNCATEGORIZED,
+    UPDATE_INTERVAL,
+)
+from .index import ItemListIndex, MasterItemIndex
+from .metrics import Metrics
+from .model import normalize_name
+from .mutation_queue import PENDING_ID_PREFIX, MutationQueue
+from .tracing import Tracer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Item fields whose change is reported to subscribers as an update
+_ITEM_FIELDS = ("name", "crossed_off", "crossed_off_at", "category_id", "note")
+
+# Bullet, checkbox or numbering at the start of a pasted line
+_LINE_MARKER = re.compile(
+    r"^(?:[-*+\u2022\u25aa\u25e6\u2610\u2611\u2713\u2714]"
+    r"|\[[ xX]?\]|\d+[.)](?=\s))\s*"
+)
+
+
+def parse_import_text(text: str) -> list[str]:
+    """Split pasted text, one item per line, into item names.
+
+    Bullets, checkboxes and numbering are stripped and whitespace is
+    collapsed.  Blank lines and headings (lines ending in a colon, like
+    "Ingredients:") are dropped.
+    """
+    names = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        while match := _LINE_MARKER.match(line):
+            line = line[match.end():]
+        if line and not line.endswith(":"):
+            names.append(line)
+    return names
+
+
+def group_items(items: list[dict], categories: dict) -> dict:
+    """Arrange a list's items the way the card shows them.
+
+    Active items are grouped by category: the master list's category for
+    the item's name, else the category of the item itself.  Groups are in
+    alphabetical order with UNCATEGORIZED last, and items within a group
+    are sorted by name.  Crossed-off items follow in the order they were
+    crossed off.
+    """
+    master_categories = categories.get("master_categories", {})
+    category_id_map = categories.get("category_id_map", {})
+    groups: dict[str, list[dict]] = {}
+    crossed_off = []
+    for item in items:
+        if item["crossed_off"]:
+            crossed_off.append(item)
+            continue
+        category = (
+            master_categories.get(normalize_name(item["name"]))
+            or category_id_map.get(item.get("category_id", ""))
+            or UNCATEGORIZED
+        )
+        groups.setdefault(category, []).append(item)
+    return {
+        "groups": [
+            {
+                "category": category,
+                "items": sorted(groups[category], key=lambda i: i["name"].lower()),
+            }
+            for category in sorted(
+                groups, key=lambda c: (c == UNCATEGORIZED, c.lower())
+            )
+        ],
+        "crossed_off": sorted(
+            crossed_off, key=lambda i: i.get("crossed_off_at") or 0
+        ),
+    }
+
+
+def items_by_name(items: list[dict]) -> tuple[dict[str, dict], dict[str, dict]]:
+    """Return a list's active and its crossed-off items by name key.
+
+    The first item with a name wins.
+    """
+    active: dict[str, dict] = {}
+    crossed_off: dict[str, dict] = {}
+    for item in items:
+        target = crossed_off if item["crossed_off"] else active
+        target.setdefault(normalize_name(item["name"]), item)
+    return active, crossed_off
+
+
+def diff_items(old: list[dict], new: list[dict]) -> dict | None:
+    """Return the added/removed/updated delta between two item lists.
+
+    Returns None when the lists are equivalent.
+    """
+    old_by_id = {item["id"]: item for item in old}
+    new_ids = set()
+    added = []
+    updated = []
+    for item in new:
+        new_ids.add(item["id"])
+        prev = old_by_id.get(item["id"])
+        if prev is None:
+            added.append(item)
+        elif any(prev.get(f) != item.get(f) for f in _ITEM_FIELDS):
+            updated.append(item)
+    removed = [item_id for item_id in old_by_id if item_id not in new_ids]
+
+    if not (added or removed or updated):
+        return None
+    return {"added": added, "removed": removed, "updated": updated}
+
+
+class OurGroceriesKioskCoordinator(DataUpdateCoordinator[dict]):
+    """Fetch lists, categories and the master list once for all clients."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, api: OurGroceriesAPI
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+        )
+        self.api = api
+        self._entry = entry
+        # Client activity driving the refresh cadence: when any command was
+        # last received, and when each list was last read or written.
+        self._last_activity = time.monotonic()
+        self._viewed: dict[str, float] = {}
+        self._full_refresh_at = 0.0
+        # (time, upstream request total) after each refresh in the last hour
+        self._request_log: deque[tuple[float, int]] = deque(
+            [(time.monotonic(), 0)]
+        )
+        # Items and upstream version for every list a client has opened.
+        self._list_items: dict[str, list[dict]] = {}
+        self._list_versions: dict[str, str] = {}
+        # Recent item snapshots per list, keyed by version, so a client
+        # that names the version it last saw can be sent just a diff.
+        self._list_history: dict[str, dict[str, list[dict]]] = {}
+        # Last grouped view built per list, see async_get_list_view
+        self._list_views: dict[str, dict] = {}
+        # Item name -> lists index.  Seeded with every list the first time
+        # a client asks for it, then kept current from list snapshots and
+        # in-place mutation updates.
+        self.item_index = ItemListIndex()
+        self._index_seeded = False
+        self._index_lock = asyncio.Lock()
+        self._index_reconciled_at = 0.0
+        self._index_pushed_revision = 0
+        # Set by the todo platform: every list gets an entity, so every
+        # list is kept current whether or not a client has opened it.
+        self.track_all_lists = False
+        # Search index over the master list, rebuilt when it changes
+        self.master_index = MasterItemIndex()
+        self._subscribers: set[Callable[[dict], None]] = set()
+        self._mutations = {
+            "add_item": self._add_item,
+            "remove_item": self._remove_item,
+            "update_item": self._update_item,
+            "toggle_crossed_off": self._toggle_crossed_off,
+            "delete_crossed_off": self._delete_crossed_off,
+            "set_item_category": self._set_item_category,
+        }
+        self.queue = MutationQueue(
+            hass, entry.entry_id, self._apply_queued, self._async_queue_flushed
+        )
+        self._snapshot_store: Store[dict] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot"
+        )
+        self._snapshot_save_pending = False
+        # True while serving a snapshot restored from disk that no refresh
+        # has confirmed yet.
+        self.stale = False
+
+    async def _async_update_data(self) -> dict:
+        """Refresh the shared snapshot from OurGroceries.
+
+        A full refresh runs at most every UPDATE_INTERVAL.  Refreshes in
+        between are the fast polls of an active kiosk: they only check the
+        list overview and re-fetch the lists being viewed that changed,
+        plus any tracked list that was never fetched.
+        """
+        requests_before = self.metrics.upstream_requests
+        now = time.monotonic()
+        full = not self.categories or (
+            now - self._full_refresh_at >= UPDATE_INTERVAL
+        )
+        reconcile = full and self._index_seeded and (
+            now - self._index_reconciled_at >= INDEX_RECONCILE_INTERVAL
+        )
+        try:
+            with upstream_priority(Priority.BACKGROUND):
+                lists = await self.api.get_lists()
+                if full:
+                    categories = await self.api.get_categories()
+                else:
+                    categories = self.categories
+                versions = {sl["id"]: sl.get("version") for sl in lists}
+                for list_id in list(self._list_items):
+                    if list_id not in versions:
+                        self._forget_list(list_id)
+                stale = self._stale_lists(versions, reconcile)
+                if not full:
+                    viewed = self._viewed_lists(now)
+                    stale = [
+                        list_id
+                        for list_id in stale
+                        if list_id in viewed or list_id not in self._list_items
+                    ]
+                results = await asyncio.gather(
+                    *(self.api.get_list(list_id) for list_id in stale)
+                )
+        except Exception as err:
+            raise UpdateFailed(f"Error refreshing OurGroceries: {err}") from err
+
+        self.item_index.set_list_names({sl["id"]: sl["name"] for sl in lists})
+        for list_id, snapshot in zip(stale, results):
+            self._set_list(list_id, snapshot)
+        self._push_index()
+        if lists != self.lists:
+            self._notify({"type": "lists", "lists": lists})
+            self._schedule_snapshot_save()
+        if categories.get("hash") != self.categories.get("hash"):
+            self._index_master(categories)
+            self._notify({"type": "categories", **categories})
+            self._schedule_snapshot_save()
+
+        self.stale = False
+        if full:
+            self._full_refresh_at = now
+        if reconcile:
+            self._index_reconciled_at = now
+        self.update_interval = self._next_interval(
+            self.metrics.upstream_requests - requests_before
+        )
+        return {"lists": lists, "categories": categories}
+
+    @callback
+    def async_note_activity(self, list_id: str | None = None) -> None:
+        """Record that a kiosk is in use, optionally viewing a list.
+
+        Only user actions count: opening a list and changing lists.  The
+        card re-reads a list after every pushed change, so counting reads
+        would let one change keep every kiosk on the fast poll.  Waking up
+        from idle refreshes right away, since the snapshot may be minutes
+        old by then.
+        """
+        now = time.monotonic()
+        was_idle = now - self._last_activity >= ACTIVE_WINDOW
+        self._last_activity = now
+        if list_id:
+            self._viewed[list_id] = now
+        if was_idle:
+            self.update_interval = timedelta(seconds=ACTIVE_REFRESH_INTERVAL)
+            self.hass.async_create_task(self.async_request_refresh())
+
+    def _viewed_lists(self, now: float) -> set[str]:
+        """Return the lists a kiosk used within the active window."""
+        for list_id, seen in list(self._viewed.items()):
+            if now - seen >= ACTIVE_WINDOW:
+                del self._viewed[list_id]
+        return set(self._viewed)
+
+    def _next_interval(self, refresh_cost: int) -> timedelta:
+        """Pick the delay before the next refresh.
+
+        Fast while kiosks are active, backing off exponentially once they
+        go idle, and never so often that refreshing alone would exceed the
+        hourly request budget.  If everything upstream in the last hour
+        (client mutations included) already used up the budget, the idle
+        maximum applies.
+        """
+        now = time.monotonic()
+        budget = self._entry.options.get(
+            CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+        )
+        total = self.metrics.upstream_requests
+        self._request_log.append((now, total))
+        while len(self._request_log) > 1 and now - self._request_log[1][0] >= 3600:
+            self._request_log.popleft()
+        spent = total - self._request_log[0][1]
+
+        idle_for = now - self._last_activity
+        if idle_for < ACTIVE_WINDOW:
+            seconds = ACTIVE_REFRESH_INTERVAL
+        else:
+            steps = int((idle_for - ACTIVE_WINDOW) // IDLE_BACKOFF_STEP)
+            seconds = min(IDLE_REFRESH_MAX, UPDATE_INTERVAL * 2**steps)
+        seconds = max(seconds, refresh_cost * 3600 / budget)
+        if spent >= budget:
+            seconds = max(seconds, IDLE_REFRESH_MAX)
+        jitter = random.uniform(1 - REFRESH_JITTER, 1 + REFRESH_JITTER)
+        return timedelta(seconds=seconds * jitter)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the snapshot saved before the last shutdown, if any.
+
+        Restored data is served as-is and flagged ``stale`` until the next
+        successful refresh.  List versions are restored too, so that
+        refresh only re-fetches the lists that changed in the meantime.
+        """
+        data = await self._snapshot_store.async_load()
+        if not data:
+            return False
+        lists = data["lists"]
+        self.item_index.set_list_names({sl["id"]: sl["name"] for sl in lists})
+        for list_id, snapshot in data["list_items"].items():
+            self._set_list(list_id, snapshot)
+        self.data = {"lists": lists, "categories": data["categories"]}
+        self._index_master(self.categories)
+        if data.get("index_seeded"):
+            self._index_seeded = True
+            self._index_reconciled_at = time.monotonic()
+            self._index_pushed_revision = self.item_index.revision
+        self.stale = True
+        return True
+
+    def _index_master(self, categories: dict) -> None:
+        self.master_index.rebuild(
+            categories.get("master_items", []),
+            categories.get("master_categories", {}),
+        )
+
+    @callback
+    def _schedule_snapshot_save(self) -> None:
+        """Persist the snapshot soon after it changed.
+
+        Only the first change schedules the write; later ones are included
+        in it, so a steady stream of changes can't keep postponing it.
+        """
+        if self._snapshot_save_pending:
+            return
+        self._snapshot_save_pending = True
+        self._snapshot_store.async_delay_save(
+            self._snapshot_data, SNAPSHOT_SAVE_DELAY
+        )
+
+    @callback
+    def _snapshot_data(self) -> dict:
+        self._snapshot_save_pending = False
+        return {
+            "lists": self.lists,
+            "categories": self.categories,
+            "list_items": {
+                list_id: {
+                    "version": self._list_versions[list_id],
+                    "items": items,
+                }
+                for list_id, items in self._list_items.items()
+            },
+            "index_seeded": self._index_seeded,
+        }
+
+    def _stale_lists(self, versions: dict[str, str], reconcile: bool) -> list[str]:
+        """Return the ids of lists that need re-fetching this cycle.
+
+        Tracked lists are re-fetched only when their upstream version moved.
+        Once the item index is seeded every list is tracked, and all of
+        them are re-fetched when ``reconcile`` is set, which full refreshes
+        do on the slow reconcile cadence to correct any drift from
+        in-place updates.
+        """
+        if reconcile:
+            return list(versions)
+        if self._index_seeded or self.track_all_lists:
+            tracked = list(versions)
+        else:
+            tracked = list(self._list_items)
+        return [
+            list_id
+            for list_id in tracked
+            if not versions[list_id]
+            or versions[list_id] != self._list_versions.get(list_id)
+        ]
+
+    @property
+    def metrics(self) -> Metrics:
+        """Return the runtime metrics shared with the API client."""
+        return self.api.metrics
+
+    @property
+    def tracer(self) -> Tracer:
+        """Return the request tracer shared with the API client."""
+        return self.api.tracer
+
+    @property
+    def lists(self) -> list[dict]:
+        """Return the cached shopping lists."""
+        return (self.data or {}).get("lists", [])
+
+    @property
+    def categories(self) -> dict:
+        """Return the cached category and master list payload."""
+        return (self.data or {}).get("categories", {})
+
+    @callback
+    def async_subscribe(self, send: Callable[[dict], None]) -> CALLBACK_TYPE:
+        """Register a callback that receives change events.
+
+        Returns a callable that removes the subscription.
+        """
+        self._subscribers.add(send)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._subscribers.discard(send)
+
+        return _unsubscribe
+
+    @callback
+    def _notify(self, event: dict) -> None:
+        """Send a change event to every subscriber."""
+        for send in list(self._subscribers):
+            send(event)
+
+    def list_items(self, list_id: str) -> list[dict] | None:
+        """Return a list's items as clients see them, if it is tracked."""
+        if list_id not in self._list_items:
+            return None
+        return self._view(list_id)[1]
+
+    def _view(self, list_id: str) -> tuple[str, list[dict]]:
+        """Return a tracked list's version and items as clients see them.
+
+        Mutations still in the write-behind queue are overlaid on the
+        upstream snapshot and reflected in the version.
+        """
+        version = self._list_versions[list_id]
+        items = self._list_items[list_id]
+        if self.queue.touches(list_id):
+            version = f"{version}+{self.queue.revision}"
+            items = self.queue.overlay(list_id, items)
+        return version, items
+
+    @callback
+    def _notify_view_change(self, list_id: str, before: list[dict]) -> None:
+        """Push the delta between an earlier view of a list and now."""
+        version, items = self._view(list_id)
+        delta = diff_items(before, items)
+        if delta is not None:
+            self._notify(
+                {"type": "items", "list_id": list_id, "version": version, **delta}
+            )
+
+    @callback
+    def _set_list(
+        self, list_id: str, snapshot: dict, before: list[dict] | None = None
+    ) -> None:
+        """Store a fresh copy of a list and push what changed.
+
+        ``before`` is the view subscribers last saw, when the caller has
+        already changed the queue overlay since then.
+        """
+        if before is None and list_id in self._list_items:
+            before = self._view(list_id)[1]
+        version = snapshot["version"]
+        items = snapshot["items"]
+        changed = version != self._list_versions.get(list_id)
+        self._list_items[list_id] = items
+        self._list_versions[list_id] = version
+
+        self.item_index.set_list(list_id, items)
+
+        history = self._list_history.setdefault(list_id, {})
+        history.pop(version, None)
+        history[version] = items
+        while len(history) > LIST_HISTORY_SIZE:
+            del history[next(iter(history))]
+
+        if before is not None:
+            self._notify_view_change(list_id, before)
+        if changed and self.data is not None:
+            self._schedule_snapshot_save()
+
+    @callback
+    def _forget_list(self, list_id: str) -> None:
+        """Stop tracking a list that no longer exists upstream."""
+        self._list_items.pop(list_id, None)
+        self._list_versions.pop(list_id, None)
+        self._list_history.pop(list_id, None)
+        self._list_views.pop(list_id, None)
+        self.item_index.remove_list(list_id)
+
+    @callback
+    def _push_index(self) -> None:
+        """Send the item-list map to subscribers if it changed."""
+        if not self._index_seeded:
+            return
+        if self.item_index.revision == self._index_pushed_revision:
+            return
+        self._index_pushed_revision = self.item_index.revision
+        self._notify({"type": "item_list_map", "map": self.item_index.as_dict()})
+
+    def _find_item(self, list_id: str, item_id: str) -> dict | None:
+        """Return a cached item by id, if its list is tracked."""
+        for item in self._list_items.get(list_id, ()):
+            if item["id"] == item_id:
+                return item
+        return None
+
+    async def async_get_list_items(
+        self, list_id: str, since_version: str | None = None
+    ) -> dict:
+        """Return a list's items relative to the version the caller has.
+
+        The reply always carries the current ``version`` and then one of:
+        ``unchanged`` when the caller is up to date, a ``delta`` when the
+        caller's version is still in the recent history, or the full
+        ``items`` otherwise.  A read without a version opens the list.
+        """
+        if not since_version:
+            self.async_note_activity(list_id)
+        cached = list_id in self._list_items
+        self.metrics.record_cache("list_snapshot", cached)
+        if not cached:
+            await self.async_refresh_list(list_id)
+        version, items = self._view(list_id)
+
+        if since_version and since_version == version:
+            return {"version": version, "unchanged": True}
+        previous = None
+        if since_version:
+            previous = self._list_history[list_id].get(since_version)
+        if previous is not None:
+            delta = diff_items(previous, items) or {
+                "added": [], "removed": [], "updated": []
+            }
+            return {"version": version, "delta": delta}
+        return {"version": version, "items": items}
+
+    async def async_get_list_view(
+        self, list_id: str, since_version: str | None = None
+    ) -> dict:
+        """Return a list's items grouped and sorted for display.
+
+        The view's ``version`` combines the list version and the
+        categories hash; it is rebuilt only when either moved, and a caller
+        that already has it is told it is ``unchanged``.
+        """
+        if list_id not in self._list_items:
+            await self.async_refresh_list(list_id)
+        items_version, items = self._view(list_id)
+        categories_hash = self.categories.get("hash", "")
+        version = f"{items_version}/{categories_hash}"
+
+        if since_version and since_version == version:
+            return {"version": version, "unchanged": True}
+        view = self._list_views.get(list_id)
+        hit = view is not None and view["version"] == version
+        self.metrics.record_cache("list_view", hit)
+        if not hit:
+            view = {
+                "version": version,
+                "items_version": items_version,
+                "categories_hash": categories_hash,
+                **group_items(items, self.categories),
+            }
+            self._list_views[list_id] = view
+        return view
+
+    async def async_refresh_list(self, list_id: str) -> None:
+        """Re-fetch a single list after it was changed by a client."""
+        self._set_list(list_id, await self.api.get_list(list_id))
+
+    async def async_list_changed(self, *list_ids: str) -> None:
+        """Bring the snapshot up to date after a client mutated lists.
+
+        The changed lists are re-fetched right away so the caller's next
+        read sees its own write and other kiosks receive the delta;
+        everything else (item counts, categories) is picked up by a
+        debounced full refresh.
+        """
+        await asyncio.gather(
+            *(self._async_refresh_quietly(list_id) for list_id in list_ids)
+        )
+        self._push_index()
+        await self._async_request_full_refresh()
+
+    async def _async_request_full_refresh(self) -> None:
+        """Request a debounced refresh that also reloads categories.
+
+        Mutations can change the master list (added counts, categories),
+        which the fast polls of an active kiosk do not look at.
+        """
+        self._full_refresh_at = 0.0
+        await self.async_request_refresh()
+
+    async def _async_refresh_quietly(self, list_id: str) -> None:
+        try:
+            await self.async_refresh_list(list_id)
+        except Exception:
+            _LOGGER.debug("Failed to refresh list %s after change", list_id)
+
+    async def async_set_item_category(
+        self, item_name: str, category_name: str, list_id: str = ""
+    ) -> None:
+        """Recategorize an item on the master list and optionally a list."""
+        self.async_note_activity(list_id)
+        await self.queue.async_flush([list_id])
+        await self._set_item_category(item_name, category_name, list_id)
+        if list_id:
+            await self.async_list_changed(list_id)
+        else:
+            await self._async_request_full_refresh()
+
+    async def async_run_batch(
+        self,
+        operations: list[dict],
+        concurrency: int,
+        on_result: Callable[[int, dict], None] | None = None,
+    ) -> list[dict]:
+        """Run many mutations with at most ``concurrency`` in flight.
+
+        Each operation is a dict naming its ``op`` plus that mutation's
+        arguments.  A failing operation is reported in its result and does
+        not stop the others.  ``on_result`` is called with each operation's
+        position and result as it completes.  Every touched list is
+        re-fetched once at the end rather than after each operation.
+
+        Queued mutations of the touched lists are sent first, so the batch
+        runs after them; if they can't be, every operation fails with the
+        reason.
+        """
+        touched = {op["list_id"] for op in operations if op.get("list_id")}
+        for list_id in touched:
+            self.async_note_activity(list_id)
+        flushed = asyncio.ensure_future(self.queue.async_flush(touched))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(pos: int, operation: dict) -> dict:
+            args = {k: v for k, v in operation.items() if k != "op"}
+            async with semaphore:
+                try:
+                    await flushed
+                    await self._mutations[operation["op"]](**args)
+                except Exception as err:
+                    result = {"success": False, "error": str(err)}
+                else:
+                    result = {"success": True}
+            if on_result is not None:
+                on_result(pos, result)
+            return result
+
+        results = await asyncio.gather(
+            *(run(pos, op) for pos, op in enumerate(operations))
+        )
+        await self.async_list_changed(*touched)
+        return results
+
+    async def async_transfer_items(
+        self,
+        source_list_id: str,
+        destination_list_id: str,
+        item_ids: list[str],
+        move: bool,
+        concurrency: int,
+    ) -> list[dict]:
+        """Copy or move items from one list to another.
+
+        Each item keeps its name, category and note.  An item already
+        active on the destination is not added again, and a crossed-off
+        one there is uncrossed instead.  When moving, an item is removed
+        from the source only after it is on the destination, so a failure
+        never loses it.  Items are transferred concurrently, and the result
+        for each says what was done (``action`` is "added", "uncrossed" or
+        "existing") and whether it fully succeeded.  Queued mutations of
+        either list are sent first.
+        """
+        if source_list_id == destination_list_id:
+            raise ValueError("Source and destination list are the same")
+        self.async_note_activity(source_list_id)
+        self.async_note_activity(destination_list_id)
+        await self.queue.async_flush((source_list_id, destination_list_id))
+        await asyncio.gather(
+            self.async_get_list_items(source_list_id),
+            self.async_get_list_items(destination_list_id),
+        )
+        source = {item["id"]: item for item in self._view(source_list_id)[1]}
+        active, crossed_off = items_by_name(self._view(destination_list_id)[1])
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def transfer(item_id: str) -> dict:
+            item = source.get(item_id)
+            if item is None or item_id.startswith(PENDING_ID_PREFIX):
+                return {
+                    "item_id": item_id,
+                    "success": False,
+                    "error": "Item not found on the source list",
+                }
+            result = {"item_id": item_id, "name": item["name"]}
+            key = normalize_name(item["name"])
+            async with semaphore:
+                try:
+                    if key in active:
+                        result["action"] = "existing"
+                    elif key in crossed_off:
+                        result["action"] = "uncrossed"
+                        await self._toggle_crossed_off(
+                            destination_list_id, crossed_off[key]["id"], False
+                        )
+                    else:
+                        result["action"] = "added"
+                        await self._add_item(
+                            destination_list_id,
+                            item["name"],
+                            item["category_id"],
+                            item["note"],
+                        )
+                    if move:
+                        await self._remove_item(source_list_id, item_id)
+                except Exception as err:
+                    return {**result, "success": False, "error": str(err)}
+            return {**result, "success": True}
+
+        results = await asyncio.gather(
+            *(transfer(item_id) for item_id in dict.fromkeys(item_ids))
+        )
+        await self.async_list_changed(source_list_id, destination_list_id)
+        return results
+
+    async def async_plan_import(
+        self, list_id: str, text: str
+    ) -> list[tuple[str, dict | None]]:
+        """Work out how to import pasted text into a list.
+
+        Returns one ``(item name, operation)`` pair per distinct line, the
+        operation being a batch operation for async_run_batch.  Items
+        already active on the list get no operation, crossed-off ones are
+        uncrossed, and the rest are added, spelled as on the master list
+        when they are on it.
+        """
+        names = parse_import_text(text)
+        if len(names) > MAX_IMPORT_ITEMS:
+            raise ValueError(
+                f"Too many items to import ({len(names)}, at most "
+                f"{MAX_IMPORT_ITEMS})"
+            )
+        await self.async_get_list_items(list_id)
+        active, crossed_off = items_by_name(self._view(list_id)[1])
+
+        plan: list[tuple[str, dict | None]] = []
+        seen = set()
+        for name in names:
+            key = normalize_name(name)
+            if key in seen:
+                continue
+            seen.add(key)
+            if key in active:
+                plan.append((active[key]["name"], None))
+            elif key in crossed_off:
+                item = crossed_off[key]
+                plan.append((item["name"], {
+                    "op": "toggle_crossed_off",
+                    "list_id": list_id,
+                    "item_id": item["id"],
+                    "cross_off": False,
+                }))
+            else:
+                name = self.master_index.lookup(name) or name
+                plan.append(
+                    (name, {"op": "add_item", "list_id": list_id, "name": name})
+                )
+        return plan
+
+    async def async_enqueue(self, op: str, **args) -> dict:
+        """Queue a list mutation for write-behind and reflect it right away.
+
+        Returns once the mutation is persisted; subscribers and reads see
+        it immediately, and OurGroceries is updated in the background.
+        """
+        list_id = args["list_id"]
+        self.async_note_activity(list_id)
+        before = self._view(list_id)[1] if list_id in self._list_items else None
+        previous = None
+        if op == "toggle_crossed_off" and before is not None:
+            item = next((i for i in before if i["id"] == args["item_id"]), None)
+            previous = item["crossed_off"] if item is not None else None
+
+        result = await self.queue.async_enqueue(op, args, previous)
+
+        if op == "add_item":
+            self.item_index.add(list_id, result["item_id"], args["name"])
+        else:
+            self._index_item_change(op, args)
+        if before is not None:
+            self._notify_view_change(list_id, before)
+        self._push_index()
+        return result
+
+    async def _apply_queued(self, entry: dict) -> None:
+        """Send one queued mutation upstream.
+
+        Operations on an item whose add was sent before they were queued
+        are resolved to the real item by name.  A failed add may still
+        have reached OurGroceries, so it is only sent again if the item is
+        not on the list by now.
+        """
+        op = entry["op"]
+        args = dict(entry["args"])
+        list_id = args["list_id"]
+        if args.get("item_id", "").startswith(PENDING_ID_PREFIX):
+            item = await self._find_named_item(list_id, entry["name"])
+            if item is None:
+                raise ValueError(f"{entry['name']} is no longer on the list")
+            args["item_id"] = item["id"]
+        if op != "add_item":
+            await self._mutations[op](**args)
+            return
+
+        cross_off = args.pop("cross_off", False)
+        item = None
+        if entry.get("attempts"):
+            item = await self._find_named_item(
+                list_id, args["name"], active_only=True
+            )
+        if item is None:
+            await self._add_item(**args)
+        if cross_off:
+            if item is None:
+                item = await self._find_named_item(
+                    list_id, args["name"], active_only=True
+                )
+            if item is None:
+                raise ValueError(f"{args['name']} was not added to the list")
+            await self._toggle_crossed_off(list_id, item["id"], True)
+
+    async def _find_named_item(
+        self, list_id: str, name: str, active_only: bool = False
+    ) -> dict | None:
+        """Fetch a list and return the last item on it named ``name``."""
+        key = normalize_name(name)
+        items = await self.api.get_list_items(list_id)
+        return next(
+            (
+                item for item in reversed(items)
+                if normalize_name(item["name"]) == key
+                and not (active_only and item["crossed_off"])
+            ),
+            None,
+        )
+
+    async def _async_queue_flushed(self, list_ids: set[str]) -> None:
+        """Re-fetch lists the queue wrote to and retire its overlay."""
+        list_ids = [lid for lid in list_ids if lid in self._list_items]
+        # The overlay already shows these writes, so nobody waits on this
+        with upstream_priority(Priority.BACKGROUND):
+            results = await asyncio.gather(
+                *(self.api.get_list(list_id) for list_id in list_ids),
+                return_exceptions=True,
+            )
+        befores = {list_id: self._view(list_id)[1] for list_id in list_ids}
+        self.queue.settle()
+        for list_id, result in zip(list_ids, results):
+            if isinstance(result, Exception):
+                self._notify_view_change(list_id, befores[list_id])
+            else:
+                self._set_list(list_id, result, befores[list_id])
+        self._push_index()
+        await self._async_request_full_refresh()
+
+    def _index_item_change(self, op: str, args: dict) -> None:
+        """Reflect a change to an existing item in the item index."""
+        list_id = args["list_id"]
+        item_id = args.get("item_id", "")
+        if op == "remove_item" or (
+            op == "toggle_crossed_off" and args["cross_off"]
+        ):
+            self.item_index.discard(list_id, item_id)
+        elif op in ("update_item", "toggle_crossed_off"):
+            item = self._find_item(list_id, item_id)
+            if item is None:
+                return
+            if op == "update_item" and item["crossed_off"]:
+                return
+            self.item_index.add(list_id, item_id, args.get("name", item["name"]))
+
+    # Mutations without the follow-up refresh.  Each updates the item index
+    # in place so the item-list map is right before the list is re-fetched.
+
+    async def _add_item(
+        self, list_id: str, name: str, category_id: str = "", note: str = ""
+    ) -> None:
+        await self.api.add_item(list_id, name, category_id, note)
+        # The real item id is only known after the re-fetch, which replaces
+        # this placeholder entry.
+        self.item_index.add(
+            list_id, f"{PENDING_ID_PREFIX}{normalize_name(name)}", name
+        )
+
+    async def _remove_item(self, list_id: str, item_id: str) -> None:
+        await self.api.remove_item(list_id, item_id)
+        self._index_item_change(
+            "remove_item", {"list_id": list_id, "item_id": item_id}
+        )
+
+    async def _update_item(
+        self, list_id: str, item_id: str, name: str, category_id: str = ""
+    ) -> None:
+        await self.api.update_item(list_id, item_id, name, category_id)
+        self._index_item_change(
+            "update_item", {"list_id": list_id, "item_id": item_id, "name": name}
+        )
+
+    async def _toggle_crossed_off(
+        self, list_id: str, item_id: str, cross_off: bool
+    ) -> None:
+        await self.api.toggle_crossed_off(list_id, item_id, cross_off)
+        self._index_item_change(
+            "toggle_crossed_off",
+            {"list_id": list_id, "item_id": item_id, "cross_off": cross_off},
+        )
+
+    async def _delete_crossed_off(self, list_id: str) -> None:
+        # Crossed-off items are never in the index.
+        await self.api.delete_crossed_off(list_id)
+
+    async def _set_item_category(
+        self, item_name: str, category_name: str, list_id: str = ""
+    ) -> None:
+        await self.api.set_item_category(item_name, category_name, list_id)
+
+    async def async_get_item_list_map(self) -> dict[str, list[str]]:
+        """Return the item name -> list names map from the index."""
+        if not self._index_seeded:
+            async with self._index_lock:
+                if not self._index_seeded:
+                    await self._async_seed_index()
+        return self.item_index.as_dict()
+
+    async def async_search_items(
+        self, query: str, limit: int, list_id: str = ""
+    ) -> list[dict]:
+        """Return ranked master list matches for a search query.
+
+        Each match is annotated with the names of the lists it is active
+        on and, when ``list_id`` names a tracked list, whether it is on
+        that one.
+        """
+        matches = self.master_index.search(query, limit)
+        item_lists = await self.async_get_item_list_map()
+        on_list = None
+        if list_id in self._list_items:
+            on_list = {
+                normalize_name(item["name"])
+                for item in self._view(list_id)[1]
+                if not item["crossed_off"]
+            }
+        for match in matches:
+            key = normalize_name(match["name"])
+            match["lists"] = item_lists.get(key, [])
+            if on_list is not None:
+                match["on_list"] = key in on_list
+        return matches
+
+    async def _async_seed_index(self) -> None:
+        """Fetch every list not yet tracked so the index covers them all."""
+        missing = [
+            sl["id"] for sl in self.lists if sl["id"] not in self._list_items
+        ]
+        with upstream_priority(Priority.BACKGROUND):
+            results = await asyncio.gather(
+                *(self.api.get_list(list_id) for list_id in missing)
+            )
+        for list_id, snapshot in zip(missing, results):
+            self._set_list(list_id, snapshot)
+        self._index_seeded = True
+        self._index_reconciled_at = time.monotonic()
+        self._index_pushed_revision = self.item_index.revision
@@ -0,0 +1,27 @@
+"""Diagnostics support for OurGroceries Kiosk."""
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD, CONF_USERNAME, DOMAIN
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "state": {
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.stale,
+            "lists": len(coordinator.lists),
+            "queued_mutations": len(coordinator.queue),
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "traces": coordinator.tracer.as_list(),
+    }
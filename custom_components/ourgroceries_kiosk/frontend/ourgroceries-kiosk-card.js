@@ -54,7 +54,9 @@ class OurGroceriesKioskCardEditor extends HTMLElement {
     this._hass = hass;
     if (!this._listsFetched && hass && hass.connection) {
       this._listsFetched = true;
-      hass.connection.sendMessagePromise({ type: 'ourgroceries_kiosk/get_lists' })
+      const msg = { type: 'ourgroceries_kiosk/get_lists' };
+      if (this._config.entry_id) msg.entry_id = this._config.entry_id;
+      hass.connection.sendMessagePromise(msg)
         .then(result => { this._lists = result.lists || []; this._render(); })
         .catch(() => {});
     }
@@ -182,11 +184,14 @@ class OurGroceriesKioskCard extends HTMLElement {
     // Data
     this._lists = [];
     this._items = [];
+    this._itemsVersion = null;
+    this._listView = null;
     this._masterCategories = {};
     this._allCategories = [];
     this._categoryNameToId = {};
     this._categoryIdMap = {};
     this._masterItems = [];
+    this._categoriesHash = null;
     this._itemListMap = {};
 
     // State
@@ -199,8 +204,11 @@ class OurGroceriesKioskCard extends HTMLElement {
     this._editNameDirty = false;
     this._editReturnView = null;
     this._autocompleteIdx = -1;
+    this._searchSeq = 0;
+    this._addViewFiltered = false;
     this._statusTimeoutId = null;
-    this._pollId = null;
+    this._unsubscribe = null;
+    this._onReconnect = () => this._resync();
     this._domBuilt = false;
     this._addViewHtmlCache = null;
     this._wizardStep = 1;
@@ -214,12 +222,12 @@ class OurGroceriesKioskCard extends HTMLElement {
 
   connectedCallback() {
     this._mediaQuery.addEventListener('change', this._onSystemThemeChange);
-    if (this._domBuilt) this._startPolling();
+    if (this._domBuilt) this._subscribe();
   }
 
   disconnectedCallback() {
     this._mediaQuery.removeEventListener('change', this._onSystemThemeChange);
-    this._stopPolling();
+    this._unsubscribeUpdates();
     if (this._statusTimeoutId) clearTimeout(this._statusTimeoutId);
   }
 
@@ -231,6 +239,7 @@ class OurGroceriesKioskCard extends HTMLElement {
       default_list: config.default_list || '',
       admin_pin: config.admin_pin || '',
       density: config.density || 'default',
+      entry_id: config.entry_id || '',
     };
     // Overlay per-device localStorage overrides on top of YAML defaults
     try {
@@ -261,7 +270,14 @@ class OurGroceriesKioskCard extends HTMLElement {
 
   async _ws(type, data = {}) {
     if (!this._hass || !this._hass.connection) throw new Error('No HA connection');
-    return await this._hass.connection.sendMessagePromise({ type, ...data });
+    return await this._hass.connection.sendMessagePromise(this._message(type, data));
+  }
+
+  // Commands go to the configured OurGroceries account, if there are several
+  _message(type, data = {}) {
+    const msg = { type, ...data };
+    if (this._config.entry_id) msg.entry_id = this._config.entry_id;
+    return msg;
   }
 
   /* ---- Initial load ---- */
@@ -275,11 +291,7 @@ class OurGroceriesKioskCard extends HTMLElement {
         this._ws('ourgroceries_kiosk/get_categories'),
       ]);
       this._lists = listsResult.lists || [];
-      this._masterCategories = catResult.master_categories || {};
-      this._allCategories = catResult.categories || [];
-      this._categoryNameToId = catResult.category_name_to_id || {};
-      this._categoryIdMap = catResult.category_id_map || {};
-      this._masterItems = catResult.master_items || [];
+      this._applyCategories(catResult);
     } catch (err) {
       console.error('OG Kiosk: initial load failed', err);
       this._lists = [];
@@ -297,7 +309,7 @@ class OurGroceriesKioskCard extends HTMLElement {
       this._renderLists();
     }
 
-    this._startPolling();
+    this._subscribe();
 
     // Load item-list-map in the background (expensive: fetches all lists' items)
     this._ws('ourgroceries_kiosk/get_item_list_map')
@@ -314,63 +326,152 @@ class OurGroceriesKioskCard extends HTMLElement {
     }
   }
 
-  /* ---- Polling ---- */
+  /* ---- Live updates ---- */
+
+  // The backend detects changes once and pushes them to every subscribed
+  // card, so there is no client-side polling.
+  async _subscribe() {
+    this._unsubscribeUpdates();
+    if (!this._hass || !this._hass.connection) return;
+    const conn = this._hass.connection;
+    conn.addEventListener('ready', this._onReconnect);
+    try {
+      const unsub = await conn.subscribeMessage(
+        event => this._onUpdate(event),
+        this._message('ourgroceries_kiosk/subscribe'),
+      );
+      this._unsubscribe = () => {
+        conn.removeEventListener('ready', this._onReconnect);
+        unsub().catch(() => {});
+      };
+    } catch (err) {
+      conn.removeEventListener('ready', this._onReconnect);
+      console.warn('OG Kiosk: subscribe failed', err);
+    }
+  }
 
-  _startPolling() {
-    this._stopPolling();
-    this._pollId = setInterval(() => this._poll(), 30000);
+  _unsubscribeUpdates() {
+    if (this._unsubscribe) { this._unsubscribe(); this._unsubscribe = null; }
   }
 
-  _stopPolling() {
-    if (this._pollId) { clearInterval(this._pollId); this._pollId = null; }
+  _applyCategories(catResult) {
+    if (catResult.unchanged) return;
+    this._categoriesHash = catResult.hash || null;
+    this._masterCategories = catResult.master_categories || {};
+    this._allCategories = catResult.categories || [];
+    this._categoryNameToId = catResult.category_name_to_id || {};
+    this._categoryIdMap = catResult.category_id_map || {};
+    this._masterItems = catResult.master_items || [];
   }
 
-  async _poll() {
+  _onUpdate(event) {
+    if (event.type === 'lists') {
+      this._lists = event.lists || [];
+      if (this._view === 'lists') this._renderLists();
+    } else if (event.type === 'categories') {
+      this._applyCategories(event);
+      if (this._view === 'list') this._refreshListView();
+    } else if (event.type === 'item_list_map') {
+      this._itemListMap = event.map || {};
+      this._refreshAddViewItems();
+    } else if (event.type === 'items' && event.list_id === this._currentListId) {
+      this._applyItemDelta(event);
+      this._itemsVersion = event.version || null;
+      if (this._view === 'list') this._refreshListView();
+      else if (this._view === 'add') this._refreshAddViewItems();
+    }
+  }
+
+  _applyItemDelta(delta) {
+    const removed = new Set(delta.removed || []);
+    const updated = new Map((delta.updated || []).map(i => [i.id, i]));
+    const items = this._items
+      .filter(i => !removed.has(i.id))
+      .map(i => updated.get(i.id) || i);
+    const known = new Set(items.map(i => i.id));
+    for (const item of delta.added || []) {
+      if (!known.has(item.id)) items.push(item);
+    }
+    this._items = items;
+  }
+
+  // Full reload after the HA connection comes back, since pushed changes
+  // may have been missed while it was down.
+  async _resync() {
     try {
-      // Fetch lists + categories in parallel; item-list-map loads separately
-      // to avoid blocking the main poll update.
       const [listsResult, catResult] = await Promise.all([
         this._ws('ourgroceries_kiosk/get_lists'),
-        this._ws('ourgroceries_kiosk/get_categories'),
+        this._ws('ourgroceries_kiosk/get_categories', this._categoriesHash ? { hash: this._categoriesHash } : {}),
       ]);
       this._lists = listsResult.lists || [];
-      this._masterCategories = catResult.master_categories || {};
-      this._allCategories = catResult.categories || [];
-      this._categoryNameToId = catResult.category_name_to_id || {};
-      this._categoryIdMap = catResult.category_id_map || {};
-      this._masterItems = catResult.master_items || [];
+      this._applyCategories(catResult);
 
       if (this._view === 'lists') this._renderLists();
       else if (this._view === 'list' && this._currentListId) {
         await this._refreshListItems();
       } else if (this._view === 'add' && this._currentListId) {
         try {
-          const result = await this._ws('ourgroceries_kiosk/get_list_items', { list_id: this._currentListId });
-          this._items = result.items || [];
+          await this._loadItems();
           this._refreshAddViewItems();
         } catch (_) {}
       }
 
-      // Refresh item-list-map in the background (expensive call)
       this._ws('ourgroceries_kiosk/get_item_list_map')
         .then(map => { this._itemListMap = map || {}; this._refreshAddViewItems(); })
         .catch(() => {});
     } catch (err) {
-      console.warn('OG Kiosk: poll failed', err);
+      console.warn('OG Kiosk: resync failed', err);
     }
   }
 
+  // Fetch the current list's items. The version we already hold is sent
+  // along so the backend can answer "unchanged" or with a small delta
+  // instead of the whole list.
+  async _loadItems() {
+    const listId = this._currentListId;
+    const msg = { list_id: listId };
+    if (this._itemsVersion) msg.version = this._itemsVersion;
+    const result = await this._ws('ourgroceries_kiosk/get_list_items', msg);
+    if (listId !== this._currentListId) return;
+    if (result.delta) this._applyItemDelta(result.delta);
+    else if (!result.unchanged) this._items = result.items || [];
+    this._itemsVersion = result.version || null;
+  }
+
   async _refreshListItems() {
     if (!this._currentListId) return;
     try {
-      const result = await this._ws('ourgroceries_kiosk/get_list_items', { list_id: this._currentListId });
-      this._items = result.items || [];
-      this._renderListItems();
+      await this._loadItems();
     } catch (err) {
       console.warn('OG Kiosk: refresh items failed', err);
+      return;
+    }
+    await this._refreshListView();
+  }
+
+  // Fetch the current list grouped by category and sorted, as the backend
+  // precomputes it, so the tablet doesn't have to.
+  async _loadListView() {
+    const listId = this._currentListId;
+    const msg = { list_id: listId };
+    if (this._listView && this._listView.list_id === listId) msg.version = this._listView.version;
+    try {
+      const view = await this._ws('ourgroceries_kiosk/get_list_view', msg);
+      if (listId === this._currentListId && !view.unchanged) {
+        this._listView = { ...view, list_id: listId };
+      }
+    } catch (err) {
+      // Rendering falls back to grouping the items here
+      console.warn('OG Kiosk: load list view failed', err);
     }
   }
 
+  async _refreshListView() {
+    if (!this._currentListId) return;
+    await this._loadListView();
+    if (this._view === 'list') this._renderListItems();
+  }
+
   /* ---- DOM construction ---- */
 
   _buildDom() {
@@ -468,8 +569,8 @@ class OurGroceriesKioskCard extends HTMLElement {
     this._currentListName = listName;
 
     try {
-      const result = await this._ws('ourgroceries_kiosk/get_list_items', { list_id: listId });
-      this._items = result.items || [];
+      this._itemsVersion = null;
+      await Promise.all([this._loadItems(), this._loadListView()]);
     } catch (err) {
       console.error('OG Kiosk: failed to load list', err);
       this._items = [];
@@ -553,23 +654,12 @@ class OurGroceriesKioskCard extends HTMLElement {
     const crossedContainer = root.querySelector('#og-crossed-container');
     if (!container || !crossedContainer) return;
 
-    const active = this._items.filter(i => !i.crossed_off);
-    const crossedOff = this._items.filter(i => i.crossed_off);
+    const { groups, crossedOff } = this._arrangeItems();
 
     // Active items grouped by category
     let html = '';
-    const grouped = this._groupByCategory(active);
-    const categoryNames = Object.keys(grouped).sort((a, b) =>
-      a === 'Uncategorized' ? 1 : b === 'Uncategorized' ? -1 :
-      a.toLowerCase().localeCompare(b.toLowerCase())
-    );
-
-    for (const cat of categoryNames) {
-      const items = grouped[cat].sort((a, b) =>
-        a.name.toLowerCase().localeCompare(b.name.toLowerCase())
-      );
-
-      html += `<div class="og-category-bar">${this._escHtml(cat)}</div>`;
+    for (const { category, items } of groups) {
+      html += `<div class="og-category-bar">${this._escHtml(category)}</div>`;
 
       for (const item of items) {
         html += `
@@ -583,7 +673,7 @@ class OurGroceriesKioskCard extends HTMLElement {
       }
     }
 
-    if (active.length === 0 && crossedOff.length === 0) {
+    if (groups.length === 0 && crossedOff.length === 0) {
       html = '<div class="og-empty">Tap the bar above to add an item.</div>';
     }
 
@@ -608,8 +698,7 @@ class OurGroceriesKioskCard extends HTMLElement {
     // Crossed-off items
     let crossedHtml = '';
     if (crossedOff.length > 0) {
-      const sorted = [...crossedOff].sort((a, b) => (a.crossed_off_at || 0) - (b.crossed_off_at || 0));
-      for (const item of sorted) {
+      for (const item of crossedOff) {
         crossedHtml += `
           <div class="og-crossed-item" data-id="${this._escAttr(item.id)}">
             <span class="og-crossed-name">${this._escHtml(item.name)}</span>
@@ -666,6 +755,32 @@ class OurGroceriesKioskCard extends HTMLElement {
     if (uncrossBtn) uncrossBtn.addEventListener('click', () => this._uncrossOffAll());
   }
 
+  // Active items grouped by category and crossed-off items in check-off
+  // order. The backend's view is used when it was built from the same
+  // items and categories as held here; otherwise they are arranged here.
+  _arrangeItems() {
+    const view = this._listView;
+    if (view && view.list_id === this._currentListId
+        && view.items_version === this._itemsVersion
+        && view.categories_hash === this._categoriesHash) {
+      return { groups: view.groups, crossedOff: view.crossed_off };
+    }
+
+    const grouped = this._groupByCategory(this._items.filter(i => !i.crossed_off));
+    const groups = Object.keys(grouped).sort((a, b) =>
+      a === 'Uncategorized' ? 1 : b === 'Uncategorized' ? -1 :
+      a.toLowerCase().localeCompare(b.toLowerCase())
+    ).map(category => ({
+      category,
+      items: grouped[category].sort((a, b) =>
+        a.name.toLowerCase().localeCompare(b.name.toLowerCase())
+      ),
+    }));
+    const crossedOff = this._items.filter(i => i.crossed_off)
+      .sort((a, b) => (a.crossed_off_at || 0) - (b.crossed_off_at || 0));
+    return { groups, crossedOff };
+  }
+
   _groupByCategory(items) {
     const groups = {};
     for (const item of items) {
@@ -687,6 +802,7 @@ class OurGroceriesKioskCard extends HTMLElement {
       // Update local state immediately
       const item = this._items.find(i => i.id === itemId);
       if (item) item.crossed_off = crossOff;
+      this._listView = null;
       this._renderListItems();
     } catch (err) {
       console.error('OG Kiosk: toggle crossed off failed', err);
@@ -698,6 +814,7 @@ class OurGroceriesKioskCard extends HTMLElement {
     try {
       await this._ws('ourgroceries_kiosk/delete_crossed_off', { list_id: this._currentListId });
       this._items = this._items.filter(i => !i.crossed_off);
+      this._listView = null;
       this._renderListItems();
     } catch (err) {
       console.error('OG Kiosk: delete crossed off failed', err);
@@ -708,12 +825,14 @@ class OurGroceriesKioskCard extends HTMLElement {
     if (!this._currentListId) return;
     const crossed = this._items.filter(i => i.crossed_off);
     try {
-      await Promise.all(crossed.map(item =>
-        this._ws('ourgroceries_kiosk/toggle_crossed_off', {
+      const { results } = await this._ws('ourgroceries_kiosk/batch', {
+        operations: crossed.map(item => ({
+          op: 'toggle_crossed_off',
           list_id: this._currentListId, item_id: item.id, cross_off: false,
-        })
-      ));
-      crossed.forEach(item => { item.crossed_off = false; });
+        })),
+      });
+      crossed.forEach((item, i) => { if (results[i].success) item.crossed_off = false; });
+      this._listView = null;
       this._renderListItems();
     } catch (err) {
       console.error('OG Kiosk: uncross all failed', err);
@@ -730,8 +849,7 @@ class OurGroceriesKioskCard extends HTMLElement {
       if (this._view === 'add') {
         // Refresh items so "on list" indicators update and we can find the new item's ID
         try {
-          const result = await this._ws('ourgroceries_kiosk/get_list_items', { list_id: this._currentListId });
-          this._items = result.items || [];
+          await this._loadItems();
           this._refreshAddViewItems();
         } catch (_) {}
         const added = this._items.find(i => i.name.toLowerCase() === name.toLowerCase() && !i.crossed_off);
@@ -750,6 +868,41 @@ class OurGroceriesKioskCard extends HTMLElement {
     }
   }
 
+  async _importItems(text) {
+    if (!this._currentListId || !this._hass || !this._hass.connection) return;
+    let unsub = null;
+    const finish = async (message) => {
+      if (unsub) unsub().catch(() => {});
+      try {
+        await this._loadItems();
+        this._refreshAddViewItems();
+      } catch (_) {}
+      this._showAddViewStatus(message);
+    };
+    try {
+      // The server dedupes against the list, then streams progress
+      // events while it adds and uncrosses items concurrently
+      unsub = await this._hass.connection.subscribeMessage(
+        event => {
+          if (event.type === 'progress') {
+            this._showAddViewStatus(`Importing… ${event.done}/${event.total}`);
+          } else if (event.type === 'done') {
+            const parts = [`Imported ${event.succeeded} item${event.succeeded === 1 ? '' : 's'}`];
+            if (event.skipped) parts.push(`${event.skipped} already on list`);
+            if (event.failed.length) parts.push(`${event.failed.length} failed`);
+            finish(parts.join(', '));
+          }
+        },
+        this._message('ourgroceries_kiosk/import_items', {
+          list_id: this._currentListId, text,
+        }),
+      );
+    } catch (err) {
+      console.error('OG Kiosk: import failed', err);
+      this._showAddViewStatus('Import failed');
+    }
+  }
+
   async _removeItem(itemId) {
     if (!this._currentListId) return;
     const item = this._items.find(i => i.id === itemId);
@@ -757,6 +910,7 @@ class OurGroceriesKioskCard extends HTMLElement {
     try {
       await this._ws('ourgroceries_kiosk/remove_item', { list_id: this._currentListId, item_id: itemId });
       this._items = this._items.filter(i => i.id !== itemId);
+      this._listView = null;
       this._showStatus(`Removed "${name}"`, 'success');
       this._renderListItems();
     } catch (err) {
@@ -818,16 +972,19 @@ class OurGroceriesKioskCard extends HTMLElement {
     allItems.sort((a, b) => b.addedCount - a.addedCount);
     let html = '';
     for (const entry of allItems) {
-      const name = entry.name;
-      const key = name.toLowerCase();
-      const lists = this._itemListMap[key] || [];
-      let subtitle = '';
-      if (lists.length === 1) {
-        subtitle = `<span class="og-add-view-on-list">On ${this._escHtml(lists[0])} list</span>`;
-      } else if (lists.length > 1) {
-        subtitle = `<span class="og-add-view-on-list">On lists: ${lists.map(l => this._escHtml(l)).join(', ')}</span>`;
-      }
-      html += `
+      html += this._addViewItemHtml(entry.name, this._itemListMap[entry.name.toLowerCase()] || []);
+    }
+    return html;
+  }
+
+  _addViewItemHtml(name, lists) {
+    let subtitle = '';
+    if (lists.length === 1) {
+      subtitle = `<span class="og-add-view-on-list">On ${this._escHtml(lists[0])} list</span>`;
+    } else if (lists.length > 1) {
+      subtitle = `<span class="og-add-view-on-list">On lists: ${lists.map(l => this._escHtml(l)).join(', ')}</span>`;
+    }
+    return `
         <button class="og-add-view-item" data-name="${this._escAttr(name)}">
           <div class="og-add-view-item-text">
             <span class="og-add-view-item-name">${this._escHtml(name)}</span>
@@ -835,8 +992,6 @@ class OurGroceriesKioskCard extends HTMLElement {
           </div>
         </button>
       `;
-    }
-    return html;
   }
 
   _prebuildAddViewHtml() {
@@ -856,8 +1011,11 @@ class OurGroceriesKioskCard extends HTMLElement {
     if (!container) return;
 
     container.innerHTML = this._addViewHtmlCache || this._buildAddViewHtml();
+    this._addViewFiltered = false;
+    this._bindAddViewItems(container);
+  }
 
-    // Bind item taps
+  _bindAddViewItems(container) {
     container.querySelectorAll('.og-add-view-item').forEach(btn => {
       btn.addEventListener('click', () => {
         this._addItem(btn.dataset.name);
@@ -873,8 +1031,7 @@ class OurGroceriesKioskCard extends HTMLElement {
     if (backBtn) backBtn.addEventListener('click', async () => {
       // Refresh items before going back so list view is up to date
       try {
-        const result = await this._ws('ourgroceries_kiosk/get_list_items', { list_id: this._currentListId });
-        this._items = result.items || [];
+        await this._loadItems();
       } catch (_) {}
       this._renderListView();
     });
@@ -889,6 +1046,15 @@ class OurGroceriesKioskCard extends HTMLElement {
         this._filterAddViewItems(input.value.trim());
       });
 
+      // Pasting several lines (a recipe, a list from elsewhere) imports
+      // them all instead of filling the search box
+      input.addEventListener('paste', (e) => {
+        const text = (e.clipboardData || window.clipboardData).getData('text');
+        if (text.split('\n').filter(l => l.trim()).length < 2) return;
+        e.preventDefault();
+        this._importItems(text);
+      });
+
       input.addEventListener('keydown', (e) => {
         if (e.key === 'Enter') {
           const name = input.value.trim();
@@ -913,6 +1079,32 @@ class OurGroceriesKioskCard extends HTMLElement {
   }
 
   _filterAddViewItems(query) {
+    // Typed queries are matched and ranked server-side; the reply replaces
+    // the full master list until the query is cleared.  Replies to
+    // superseded keystrokes are dropped.
+    const seq = ++this._searchSeq;
+    if (!query) {
+      if (this._addViewFiltered) this._populateAddViewItems();
+      return;
+    }
+    this._ws('ourgroceries_kiosk/search_items', { query, limit: 50, list_id: this._currentListId || '' })
+      .then(result => {
+        if (seq !== this._searchSeq || this._view !== 'add') return;
+        const root = this._getRoot();
+        const container = root && root.querySelector('#og-add-items');
+        if (!container) return;
+        container.innerHTML = result.items.map(i => this._addViewItemHtml(i.name, i.lists)).join('');
+        this._addViewFiltered = true;
+        this._bindAddViewItems(container);
+      })
+      .catch(() => {
+        if (seq !== this._searchSeq) return;
+        if (this._addViewFiltered) this._populateAddViewItems();
+        this._filterAddViewItemsLocally(query);
+      });
+  }
+
+  _filterAddViewItemsLocally(query) {
     const root = this._getRoot();
     if (!root) return;
     const container = root.querySelector('#og-add-items');
@@ -0,0 +1,214 @@
+"""In-memory indexes over the coordinator's list snapshots."""
+
+from .const import SEARCH_PREFIX_LENGTH
+from .model import normalize_name
+
+
+class ItemListIndex:
+    """Inverted index from normalized item name to the lists containing it.
+
+    Only active (not crossed-off) items are indexed.  Contributions are kept
+    per list and per item id, so a single list can be replaced or a single
+    item added, renamed or dropped without touching the rest of the index.
+    """
+
+    def __init__(self) -> None:
+        # list id -> item id -> name key
+        self._by_list: dict[str, dict[str, str]] = {}
+        # name key -> list id -> number of matching items on that list
+        self._by_name: dict[str, dict[str, int]] = {}
+        self._list_names: dict[str, str] = {}
+        self._view: dict[str, list[str]] | None = None
+        self.revision = 0
+
+    def __contains__(self, list_id: str) -> bool:
+        return list_id in self._by_list
+
+    def set_list_names(self, names: dict[str, str]) -> None:
+        """Update the list id -> display name mapping."""
+        if names != self._list_names:
+            self._list_names = dict(names)
+            self._changed()
+
+    def set_list(self, list_id: str, items: list[dict]) -> None:
+        """Replace everything indexed for a list with its current items."""
+        entries = {
+            item["id"]: key
+            for item in items
+            if not item.get("crossed_off")
+            and (key := normalize_name(item.get("name", "")))
+        }
+        if entries == self._by_list.get(list_id):
+            return
+        self._drop_list(list_id)
+        for key in entries.values():
+            self._link(list_id, key)
+        self._by_list[list_id] = entries
+        self._changed()
+
+    def remove_list(self, list_id: str) -> None:
+        """Forget a list entirely."""
+        if list_id in self._by_list:
+            self._drop_list(list_id)
+            self._changed()
+
+    def add(self, list_id: str, item_id: str, name: str) -> None:
+        """Index an active item on a list."""
+        key = normalize_name(name)
+        entries = self._by_list.setdefault(list_id, {})
+        if not key or entries.get(item_id) == key:
+            return
+        if item_id in entries:
+            self._unlink(list_id, entries.pop(item_id))
+        entries[item_id] = key
+        self._link(list_id, key)
+        self._changed()
+
+    def discard(self, list_id: str, item_id: str) -> None:
+        """Drop an item from the index (removed or crossed off)."""
+        key = self._by_list.get(list_id, {}).pop(item_id, None)
+        if key is not None:
+            self._unlink(list_id, key)
+            self._changed()
+
+    def as_dict(self) -> dict[str, list[str]]:
+        """Return the index as item name -> list names.
+
+        List names follow the upstream list order.  The result is cached
+        until the next change.
+        """
+        if self._view is None:
+            self._view = {
+                key: [
+                    name for lid, name in self._list_names.items()
+                    if lid in lists
+                ]
+                for key, lists in self._by_name.items()
+            }
+        return self._view
+
+    def _link(self, list_id: str, key: str) -> None:
+        lists = self._by_name.setdefault(key, {})
+        lists[list_id] = lists.get(list_id, 0) + 1
+
+    def _unlink(self, list_id: str, key: str) -> None:
+        lists = self._by_name.get(key)
+        if not lists or list_id not in lists:
+            return
+        lists[list_id] -= 1
+        if not lists[list_id]:
+            del lists[list_id]
+        if not lists:
+            del self._by_name[key]
+
+    def _drop_list(self, list_id: str) -> None:
+        for key in self._by_list.pop(list_id, {}).values():
+            self._unlink(list_id, key)
+
+    def _changed(self) -> None:
+        self._view = None
+        self.revision += 1
+
+
+class MasterItemIndex:
+    """Prefix and substring index for ranked search over the master list.
+
+    Entries are kept in rank order (most added first), and every posting
+    list holds entry positions in that same order, so the best matches of
+    a tier are always the first ones found.
+    """
+
+    def __init__(self) -> None:
+        # (name key, display name, added count, category name) in rank order
+        self._entries: list[tuple[str, str, int, str]] = []
+        # word prefix (up to SEARCH_PREFIX_LENGTH chars) -> entry positions
+        self._prefixes: dict[str, list[int]] = {}
+        # trigram -> entry positions
+        self._trigrams: dict[str, set[int]] = {}
+        # name key -> entry position
+        self._by_key: dict[str, int] = {}
+
+    def rebuild(
+        self, master_items: list[dict], master_categories: dict[str, str]
+    ) -> None:
+        """Re-index the master list.
+
+        ``master_items`` and ``master_categories`` are the fields of the
+        same names in the categories payload.
+        """
+        best: dict[str, dict] = {}
+        for item in master_items:
+            key = normalize_name(item["name"])
+            if key and (
+                key not in best
+                or item["added_count"] > best[key]["added_count"]
+            ):
+                best[key] = item
+        ranked = sorted(
+            best.items(), key=lambda kv: (-kv[1]["added_count"], kv[0])
+        )
+        self._entries = [
+            (key, item["name"].strip(), item["added_count"],
+             master_categories.get(key, ""))
+            for key, item in ranked
+        ]
+
+        prefixes: dict[str, list[int]] = {}
+        trigrams: dict[str, set[int]] = {}
+        for pos, (key, *_) in enumerate(self._entries):
+            for word in key.split():
+                for end in range(1, min(len(word), SEARCH_PREFIX_LENGTH) + 1):
+                    bucket = prefixes.setdefault(word[:end], [])
+                    if not bucket or bucket[-1] != pos:
+                        bucket.append(pos)
+            for start in range(len(key) - 2):
+                trigrams.setdefault(key[start:start + 3], set()).add(pos)
+        self._prefixes = prefixes
+        self._trigrams = trigrams
+        self._by_key = {key: pos for pos, (key, *_) in enumerate(self._entries)}
+
+    def lookup(self, name: str) -> str | None:
+        """Return the master list spelling of ``name``, if it is on it."""
+        pos = self._by_key.get(normalize_name(name))
+        return None if pos is None else self._entries[pos][1]
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """Return up to ``limit`` master items matching ``query``.
+
+        Names starting with the query rank first, then names with a word
+        starting with it, then (for queries of three or more characters)
+        names containing it anywhere.  Ties go to the most added item.
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        starts: list[int] = []
+        words: list[int] = []
+        bucket = self._prefixes.get(query.split()[0][:SEARCH_PREFIX_LENGTH], ())
+        for pos in bucket:
+            key = self._entries[pos][0]
+            if key.startswith(query):
+                starts.append(pos)
+            elif f" {query}" in f" {key}":
+                words.append(pos)
+            if len(starts) >= limit:
+                break
+
+        found = [*starts, *words][:limit]
+        if len(found) < limit and len(query) >= 3:
+            grams = [query[i:i + 3] for i in range(len(query) - 2)]
+            candidates = set.intersection(
+                *(self._trigrams.get(gram, set()) for gram in grams)
+            )
+            seen = set(found)
+            found.extend(
+                pos for pos in sorted(candidates - seen)
+                if query in self._entries[pos][0]
+            )
+            del found[limit:]
+
+        return [
+            {"name": name, "added_count": count, "category": category}
+            for _, name, count, category in (self._entries[p] for p in found)
+        ]
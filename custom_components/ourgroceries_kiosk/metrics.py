@@ -0,0 +1,124 @@
+"""Runtime metrics for the OurGroceries Kiosk integration.
+
+Counters and latency histograms are kept in memory per config entry and
+exposed through the diagnostics download and the (disabled by default)
+sensor entities.  They reset when Home Assistant restarts.
+"""
+
+import bisect
+from collections import Counter
+
+from .const import METRICS_LATENCY_BUCKETS
+
+
+class LatencyHistogram:
+    """Call count, error count and latency distribution of one operation."""
+
+    def __init__(self) -> None:
+        # One bucket per upper bound in METRICS_LATENCY_BUCKETS, plus one
+        # for anything slower
+        self.buckets = [0] * (len(METRICS_LATENCY_BUCKETS) + 1)
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float, error: bool) -> None:
+        ms = seconds * 1000
+        self.buckets[bisect.bisect_left(METRICS_LATENCY_BUCKETS, ms)] += 1
+        self.calls += 1
+        self.errors += error
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self) -> dict:
+        bounds = [f"<={b}ms" for b in METRICS_LATENCY_BUCKETS]
+        bounds.append(f">{METRICS_LATENCY_BUCKETS[-1]}ms")
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0,
+            "max_ms": round(self.max_ms, 1),
+            "histogram": dict(zip(bounds, self.buckets)),
+        }
+
+
+class Metrics:
+    """All metrics of one config entry.
+
+    ``commands`` are WebSocket commands, ``upstream`` the OurGroceriesAPI
+    methods (one sample per attempt, so retries count), ``events`` plain
+    counters such as re-logins, and ``caches`` hit/miss pairs.  HTTP
+    requests are counted separately, since one method call can make
+    several.
+    """
+
+    def __init__(self) -> None:
+        self.commands: dict[str, LatencyHistogram] = {}
+        self.upstream: dict[str, LatencyHistogram] = {}
+        self.requests = 0
+        self.request_errors = 0
+        self.events: Counter[str] = Counter()
+        self.caches: dict[str, list[int]] = {}
+
+    def record_command(self, name: str, seconds: float, error: bool) -> None:
+        self.commands.setdefault(name, LatencyHistogram()).record(seconds, error)
+
+    def record_upstream(self, name: str, seconds: float, error: bool) -> None:
+        self.upstream.setdefault(name, LatencyHistogram()).record(seconds, error)
+
+    def record_request(self, error: bool) -> None:
+        self.requests += 1
+        self.request_errors += error
+
+    def count(self, event: str) -> None:
+        self.events[event] += 1
+
+    def record_cache(self, name: str, hit: bool) -> None:
+        self.caches.setdefault(name, [0, 0])[0 if hit else 1] += 1
+
+    @staticmethod
+    def _totals(histograms: dict[str, LatencyHistogram]) -> tuple[int, int]:
+        return (
+            sum(h.calls for h in histograms.values()),
+            sum(h.errors for h in histograms.values()),
+        )
+
+    @property
+    def upstream_requests(self) -> int:
+        return self.requests
+
+    @property
+    def upstream_errors(self) -> int:
+        return self.request_errors
+
+    @property
+    def command_calls(self) -> int:
+        return self._totals(self.commands)[0]
+
+    @property
+    def command_errors(self) -> int:
+        return self._totals(self.commands)[1]
+
+    def hit_ratio(self, name: str | None = None) -> float | None:
+        """Return a cache's hit ratio in percent, or of all caches combined."""
+        pairs = [self.caches.get(name, [0, 0])] if name else self.caches.values()
+        hits = sum(p[0] for p in pairs)
+        total = hits + sum(p[1] for p in pairs)
+        return round(100 * hits / total, 1) if total else None
+
+    def as_dict(self) -> dict:
+        return {
+            "upstream_requests": self.upstream_requests,
+            "upstream_errors": self.upstream_errors,
+            "command_calls": self.command_calls,
+            "command_errors": self.command_errors,
+            "events": dict(self.events),
+            "caches": {
+                name: {"hits": hits, "misses": misses,
+                       "hit_ratio": self.hit_ratio(name)}
+                for name, (hits, misses) in self.caches.items()
+            },
+            "commands": {n: h.as_dict() for n, h in self.commands.items()},
+            "upstream": {n: h.as_dict() for n, h in self.upstream.items()},
+        }
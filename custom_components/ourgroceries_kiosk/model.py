@@ -0,0 +1,107 @@
+"""Normalized records of the OurGroceries payloads.
+
+Each fetched list payload (shopping lists, the master list and the
+category list alike) is turned into records once, with every item's name
+key computed up front.  The API methods look items up through those
+records instead of re-walking the raw dicts, and a payload whose upstream
+version has not moved reuses the records built the last time.
+"""
+
+import sys
+from dataclasses import dataclass, field
+
+
+def normalize_name(name: str) -> str:
+    """Return the lookup key for an item name.
+
+    Keys are interned, so a name that is on several lists, or in several
+    snapshots of one, is stored once.
+    """
+    return sys.intern(name.strip().lower())
+
+
+@dataclass(slots=True)
+class Item:
+    """One item of a list; also used for categories and master items."""
+
+    id: str
+    name: str
+    # normalize_name(name), empty for a blank name
+    key: str
+    category_id: str = ""
+    crossed_off: bool = False
+    crossed_off_at: int = 0
+    note: str = ""
+    added_count: int = 0
+
+    @classmethod
+    def from_raw(cls, raw: dict) -> "Item":
+        name = raw.get("value", "")
+        crossed_off_at = raw.get("crossedOffAt", 0)
+        return cls(
+            id=raw.get("id", ""),
+            name=name,
+            key=normalize_name(name),
+            category_id=raw.get("categoryId", ""),
+            # The OurGroceries API no longer returns a boolean "crossedOff".
+            # Instead, crossed-off items have a "crossedOffAt" timestamp.
+            # Fall back to the legacy "crossedOff" field if present.
+            crossed_off=bool(raw.get("crossedOff") or crossed_off_at),
+            crossed_off_at=crossed_off_at,
+            note=raw.get("note", ""),
+            added_count=raw.get("addedCount", 0),
+        )
+
+    def as_dict(self) -> dict:
+        """Return the item in the card's item shape."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "crossed_off": self.crossed_off,
+            "crossed_off_at": self.crossed_off_at,
+            "category_id": self.category_id,
+            "note": self.note,
+        }
+
+
+@dataclass(slots=True)
+class ItemList:
+    """A fetched list: its id, upstream version and items."""
+
+    id: str
+    version: str
+    items: list[Item]
+    # Name key -> item, first occurrence winning; blank names left out
+    by_key: dict[str, Item]
+    _dicts: list[dict] | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_raw(cls, raw: dict) -> "ItemList":
+        items = [Item.from_raw(item) for item in raw.get("items", [])]
+        by_key: dict[str, Item] = {}
+        for item in items:
+            if item.key:
+                by_key.setdefault(item.key, item)
+        return cls(raw.get("id", ""), raw.get("versionId", ""), items, by_key)
+
+    def as_dicts(self) -> list[dict]:
+        """Return the items in the card's item shape.
+
+        Built on first use and shared by every caller afterwards, so the
+        result must be treated as read-only.
+        """
+        if self._dicts is None:
+            self._dicts = [item.as_dict() for item in self.items]
+        return self._dicts
+
+
+def build_list(raw: dict, previous: ItemList | None) -> tuple[ItemList, bool]:
+    """Return the records of a list payload and whether they were reused.
+
+    ``previous`` is reused when the payload carries the same upstream
+    version, since OurGroceries bumps it on every change to a list.
+    """
+    version = raw.get("versionId", "")
+    if previous is not None and version and previous.version == version:
+        return previous, True
+    return ItemList.from_raw(raw), False
@@ -0,0 +1,366 @@
+"""Write-behind queue for list mutations.
+
+Mutations from the kiosks are acknowledged as soon as they are persisted
+here and are flushed to OurGroceries in the background, so a slow or
+briefly unreachable upstream never blocks the UI.  Redundant operations
+are coalesced before they are sent, and reads overlay whatever is still
+queued so every client sees a consistent list in the meantime.
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from typing import Awaitable, Callable, Iterable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import UpstreamUnavailable, is_transient
+from .const import (
+    DOMAIN,
+    QUEUE_MAX_ATTEMPTS,
+    QUEUE_RETRY_MAX,
+    QUEUE_RETRY_MIN,
+    QUEUE_STORAGE_VERSION,
+)
+from .model import normalize_name
+
+_LOGGER = logging.getLogger(__name__)
+
+# Prefix of the placeholder id given to an item that is queued for adding
+PENDING_ID_PREFIX = "pending:"
+
+# Operations that target a single existing item
+_ITEM_OPS = ("remove_item", "update_item", "toggle_crossed_off")
+
+
+class MutationQueue:
+    """Durable, coalescing FIFO of mutations waiting to reach upstream.
+
+    Each entry is ``{"op": <mutation name>, "args": {...}}`` plus optional
+    bookkeeping (``temp_id`` for adds, ``previous`` crossed-off state for
+    toggles, ``attempts`` once it has failed).  ``apply`` performs one
+    entry's mutation upstream and ``flushed`` is awaited with the ids of
+    the lists a drain touched; it is expected to re-fetch them and call
+    ``settle``.
+
+    An add can carry a ``cross_off`` argument folded in from a toggle of
+    its placeholder.  Item operations on the placeholder of an add that
+    was already sent carry the item's ``name``, which ``apply`` resolves
+    the real item by.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        apply: Callable[[dict], Awaitable[None]],
+        flushed: Callable[[set[str]], Awaitable[None]],
+    ) -> None:
+        self._hass = hass
+        self._store: Store[dict] = Store(
+            hass, QUEUE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.queue"
+        )
+        self._apply = apply
+        self._flushed = flushed
+        self._pending: list[dict] = []
+        # Entries sent upstream whose lists have not been re-fetched yet;
+        # they still count for reads so the lists don't flicker.
+        self._inflight: dict | None = None
+        self._applied: list[dict] = []
+        self._wakeup = asyncio.Event()
+        # Set, then replaced, each time the flusher is done with an entry or
+        # starts backing off; _retry_at is when its backoff ends.
+        self._progress = asyncio.Event()
+        self._retry_at: float | None = None
+        self._task: asyncio.Task | None = None
+        self.revision = 0
+
+    def __len__(self) -> int:
+        """Return the number of mutations waiting to be sent."""
+        return len(self._pending)
+
+    async def async_load(self) -> None:
+        """Restore mutations that were queued before a restart."""
+        data = await self._store.async_load()
+        if data:
+            self._pending = data.get("pending", [])
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start the background flusher; returns a callable that stops it."""
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"{DOMAIN} mutation queue"
+        )
+        if self._pending:
+            self._wakeup.set()
+
+        @callback
+        def _stop() -> None:
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+        return _stop
+
+    async def async_enqueue(
+        self, op: str, args: dict, previous: bool | None = None
+    ) -> dict:
+        """Queue a mutation durably and return its acknowledgement.
+
+        Adds are acknowledged with the placeholder ``item_id`` they show up
+        under until the list is re-fetched.  Raises ValueError for an
+        operation on a placeholder whose list has been re-fetched since.
+        """
+        result = self._coalesce({"op": op, "args": args}, previous)
+        self.revision += 1
+        await self._async_save()
+        self._wakeup.set()
+        return result
+
+    async def async_flush(self, list_ids: Iterable[str]) -> None:
+        """Wait until everything queued for ``list_ids`` has been sent.
+
+        Writes that bypass the queue call this first, so they reach
+        OurGroceries after the queued mutations of the same lists.  Raises
+        UpstreamUnavailable rather than waiting out a retry backoff.
+        """
+        list_ids = set(list_ids)
+        while self._task is not None and any(
+            entry["args"].get("list_id") in list_ids
+            for entry in (self._inflight, *self._pending)
+            if entry is not None
+        ):
+            if self._retry_at is not None:
+                raise UpstreamUnavailable(
+                    max(self._retry_at - self._hass.loop.time(), 1.0)
+                )
+            await self._progress.wait()
+
+    def _notify_progress(self) -> None:
+        self._progress.set()
+        self._progress = asyncio.Event()
+
+    @callback
+    def settle(self) -> None:
+        """Forget applied mutations once their lists have been re-fetched.
+
+        ``flushed`` calls this itself after fetching and before storing the
+        fresh lists, so the change from "overlaid" to "upstream" is seen as
+        a single step.
+        """
+        if self._applied:
+            self._applied.clear()
+            self.revision += 1
+
+    def touches(self, list_id: str) -> bool:
+        """Return True if any queued or unsettled mutation targets a list."""
+        return any(
+            entry["args"].get("list_id") == list_id for entry in self._entries()
+        )
+
+    def overlay(self, list_id: str, items: list[dict]) -> list[dict]:
+        """Return a list's items with queued mutations applied on top."""
+        entries = [
+            entry for entry in self._entries()
+            if entry["args"].get("list_id") == list_id
+        ]
+        if not entries:
+            return items
+
+        items = [dict(item) for item in items]
+        for entry in entries:
+            args = entry["args"]
+            op = entry["op"]
+            if op == "add_item":
+                items.append({
+                    "id": entry["temp_id"],
+                    "name": args["name"],
+                    "crossed_off": args.get("cross_off", False),
+                    "crossed_off_at": 0,
+                    "category_id": "",
+                    "note": "",
+                })
+            elif op == "remove_item":
+                items = [i for i in items if i["id"] != args["item_id"]]
+            elif op == "delete_crossed_off":
+                items = [i for i in items if not i["crossed_off"]]
+            elif op in ("update_item", "toggle_crossed_off"):
+                for item in items:
+                    if item["id"] != args["item_id"]:
+                        continue
+                    if op == "update_item":
+                        item["name"] = args["name"]
+                        if args.get("category_id"):
+                            item["category_id"] = args["category_id"]
+                    else:
+                        item["crossed_off"] = args["cross_off"]
+        return items
+
+    def _entries(self) -> list[dict]:
+        """Return every mutation not yet reflected upstream, oldest first."""
+        inflight = [self._inflight] if self._inflight is not None else []
+        return [*self._applied, *inflight, *self._pending]
+
+    def _coalesce(self, entry: dict, previous: bool | None) -> dict:
+        """Merge a new mutation into the pending queue."""
+        op = entry["op"]
+        args = entry["args"]
+        list_id = args.get("list_id")
+        item_id = args.get("item_id", "")
+
+        if item_id.startswith(PENDING_ID_PREFIX):
+            add = next(
+                (e for e in self._pending if e.get("temp_id") == item_id), None
+            )
+            if add is not None:
+                # The add hasn't been sent yet: fold the change into it
+                if op == "remove_item":
+                    self._pending.remove(add)
+                elif op == "update_item":
+                    add["args"]["name"] = args["name"]
+                else:
+                    add["args"]["cross_off"] = args["cross_off"]
+                return {}
+            name = self._placeholder_name(item_id)
+            if name is None:
+                raise ValueError("Item has been added since, refresh the list")
+            entry["name"] = name
+
+        if op == "add_item":
+            key = normalize_name(args["name"])
+            for e in self._pending:
+                if (
+                    e["op"] == "add_item"
+                    and e["args"]["list_id"] == list_id
+                    and normalize_name(e["args"]["name"]) == key
+                ):
+                    return {"item_id": e["temp_id"]}
+            entry["temp_id"] = f"{PENDING_ID_PREFIX}{uuid.uuid4().hex}"
+            self._pending.append(entry)
+            return {"item_id": entry["temp_id"]}
+
+        if op in _ITEM_OPS:
+            same_item = [
+                e for e in self._pending
+                if e["op"] in _ITEM_OPS
+                and e["args"]["list_id"] == list_id
+                and e["args"]["item_id"] == item_id
+            ]
+            if op == "remove_item":
+                # Nothing else matters for an item that is going away
+                for e in same_item:
+                    self._pending.remove(e)
+            elif op == "update_item":
+                for e in same_item:
+                    if e["op"] == "update_item":
+                        self._pending.remove(e)
+            else:
+                toggle = next(
+                    (e for e in same_item if e["op"] == "toggle_crossed_off"),
+                    None,
+                )
+                if toggle is not None:
+                    if args["cross_off"] == toggle.get("previous"):
+                        # Toggled back before it was sent: nothing to do
+                        self._pending.remove(toggle)
+                    else:
+                        toggle["args"]["cross_off"] = args["cross_off"]
+                    return {}
+                entry["previous"] = previous
+
+        if op == "delete_crossed_off" and self._pending and (
+            self._pending[-1] == entry
+        ):
+            return {}
+
+        self._pending.append(entry)
+        return {}
+
+    def _placeholder_name(self, temp_id: str) -> str | None:
+        """Return the name an item added under ``temp_id`` will have.
+
+        That is its name once the queued renames of it have run, or None
+        if its add has been settled or dropped.
+        """
+        name = None
+        for entry in self._entries():
+            if entry.get("temp_id") == temp_id or (
+                entry["op"] == "update_item"
+                and entry["args"]["item_id"] == temp_id
+            ):
+                name = entry["args"]["name"]
+        return name
+
+    async def _async_save(self) -> None:
+        await self._store.async_save({"pending": self._pending})
+
+    async def _async_run(self) -> None:
+        """Drain the queue whenever something is added.
+
+        Transient failures are retried with backoff; other failures drop
+        the entry so it doesn't block the queue.
+        """
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            touched: set[str] = set()
+            delay = 0.0
+
+            while self._pending:
+                entry = self._inflight = self._pending.pop(0)
+                try:
+                    await self._apply(entry)
+                except UpstreamUnavailable as err:
+                    # Nothing was sent; wait for the breaker without
+                    # spending one of the entry's attempts
+                    self._inflight = None
+                    self._pending.insert(0, entry)
+                    delay = err.retry_after
+                    break
+                except Exception as err:
+                    self._inflight = None
+                    attempts = entry["attempts"] = entry.get("attempts", 0) + 1
+                    # Only transient failures are worth waiting out; anything
+                    # else would fail again and hold up the entries behind it
+                    if not is_transient(err) or attempts >= QUEUE_MAX_ATTEMPTS:
+                        _LOGGER.warning(
+                            "Dropping queued %s after %d attempts: %s",
+                            entry["op"], attempts, err,
+                        )
+                        touched.add(entry["args"].get("list_id", ""))
+                        self.revision += 1
+                        await self._async_save()
+                        self._notify_progress()
+                        continue
+                    self._pending.insert(0, entry)
+                    await self._async_save()
+                    delay = min(
+                        QUEUE_RETRY_MAX, QUEUE_RETRY_MIN * 2 ** (attempts - 1)
+                    ) * random.uniform(0.5, 1.0)
+                    _LOGGER.debug(
+                        "Queued %s failed (%s), retrying in %.1fs",
+                        entry["op"], err, delay,
+                    )
+                    break
+                self._inflight = None
+                self._applied.append(entry)
+                touched.add(entry["args"].get("list_id", ""))
+                await self._async_save()
+                self._notify_progress()
+
+            if delay:
+                self._retry_at = self._hass.loop.time() + delay
+                self._notify_progress()
+            touched.discard("")
+            if touched:
+                try:
+                    await self._flushed(touched)
+                except Exception:
+                    _LOGGER.exception("Error refreshing lists after flush")
+            self.settle()
+            if delay:
+                await asyncio.sleep(delay)
+                self._retry_at = None
+                self._wakeup.set()
@@ -0,0 +1,144 @@
+"""Sensors exposing the integration's runtime metrics.
+
+All of them are diagnostic entities that are disabled by default; enable
+the ones you want to graph or alert on.  They update with every
+coordinator refresh.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import OurGroceriesKioskCoordinator
+from .metrics import LatencyHistogram, Metrics
+
+
+def _average_ms(histograms: dict[str, LatencyHistogram]) -> float | None:
+    calls = sum(h.calls for h in histograms.values())
+    if not calls:
+        return None
+    return round(sum(h.total_ms for h in histograms.values()) / calls, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class KioskSensorEntityDescription(SensorEntityDescription):
+    """Describes a metrics sensor."""
+
+    value_fn: Callable[[Metrics], StateType]
+
+
+SENSORS: tuple[KioskSensorEntityDescription, ...] = (
+    KioskSensorEntityDescription(
+        key="upstream_requests",
+        translation_key="upstream_requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.upstream_requests,
+    ),
+    KioskSensorEntityDescription(
+        key="upstream_errors",
+        translation_key="upstream_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.upstream_errors,
+    ),
+    KioskSensorEntityDescription(
+        key="upstream_latency",
+        translation_key="upstream_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda m: _average_ms(m.upstream),
+    ),
+    KioskSensorEntityDescription(
+        key="relogins",
+        translation_key="relogins",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.events["relogins"],
+    ),
+    KioskSensorEntityDescription(
+        key="websocket_commands",
+        translation_key="websocket_commands",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.command_calls,
+    ),
+    KioskSensorEntityDescription(
+        key="websocket_errors",
+        translation_key="websocket_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.command_errors,
+    ),
+    KioskSensorEntityDescription(
+        key="websocket_latency",
+        translation_key="websocket_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda m: _average_ms(m.commands),
+    ),
+    KioskSensorEntityDescription(
+        key="cache_hit_ratio",
+        translation_key="cache_hit_ratio",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda m: m.hit_ratio(),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the metrics sensors for a config entry."""
+    coordinator: OurGroceriesKioskCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        KioskMetricSensor(coordinator, entry, description)
+        for description in SENSORS
+    )
+
+
+class KioskMetricSensor(
+    CoordinatorEntity[OurGroceriesKioskCoordinator], SensorEntity
+):
+    """A single runtime metric."""
+
+    entity_description: KioskSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: OurGroceriesKioskCoordinator,
+        entry: ConfigEntry,
+        description: KioskSensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="OurGroceries",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def available(self) -> bool:
+        # Metrics are local, so they stay available while upstream is down
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.coordinator.metrics)
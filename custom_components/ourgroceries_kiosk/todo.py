@@ -0,0 +1,182 @@
+"""Todo entities for the OurGroceries lists.
+
+Each shopping list is a todo entity read from the coordinator's cached
+list snapshots, so automations and voice assistants share the kiosk's
+session and refresh cycle instead of polling OurGroceries themselves.
+Writes go through the write-behind queue like the card's.
+"""
+
+import logging
+
+from homeassistant.components.todo import (
+    TodoItem,
+    TodoItemStatus,
+    TodoListEntity,
+    TodoListEntityFeature,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import OurGroceriesKioskCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up a todo entity for every OurGroceries list."""
+    coordinator: OurGroceriesKioskCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.track_all_lists = True
+    # Fetch the lists nobody has opened yet without holding up setup
+    entry.async_create_background_task(
+        hass, _async_fetch_lists(coordinator), f"{DOMAIN} fetch todo lists"
+    )
+
+    known: set[str] = set()
+
+    @callback
+    def _add_new_lists() -> None:
+        new = [sl for sl in coordinator.lists if sl["id"] not in known]
+        known.update(sl["id"] for sl in new)
+        if new:
+            async_add_entities(
+                OurGroceriesTodoListEntity(coordinator, entry, sl["id"], sl["name"])
+                for sl in new
+            )
+
+    _add_new_lists()
+    entry.async_on_unload(coordinator.async_add_listener(_add_new_lists))
+
+
+async def _async_fetch_lists(coordinator: OurGroceriesKioskCoordinator) -> None:
+    try:
+        await coordinator.async_get_item_list_map()
+    except Exception as err:
+        # The next refresh fetches whatever is still missing
+        _LOGGER.warning("Could not fetch all OurGroceries lists: %s", err)
+        return
+    coordinator.async_update_listeners()
+
+
+class OurGroceriesTodoListEntity(
+    CoordinatorEntity[OurGroceriesKioskCoordinator], TodoListEntity
+):
+    """One OurGroceries list as a todo list."""
+
+    _attr_has_entity_name = True
+    _attr_supported_features = (
+        TodoListEntityFeature.CREATE_TODO_ITEM
+        | TodoListEntityFeature.UPDATE_TODO_ITEM
+        | TodoListEntityFeature.DELETE_TODO_ITEM
+    )
+
+    def __init__(
+        self,
+        coordinator: OurGroceriesKioskCoordinator,
+        entry: ConfigEntry,
+        list_id: str,
+        name: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._list_id = list_id
+        self._attr_name = name
+        self._attr_unique_id = f"{entry.entry_id}_{list_id}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="OurGroceries",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_subscribe(self._on_event))
+
+    @callback
+    def _on_event(self, event: dict) -> None:
+        # Queued writes and re-fetched lists are pushed as item events
+        # between refreshes; show them right away.
+        if event["type"] == "items" and event["list_id"] == self._list_id:
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        for sl in self.coordinator.lists:
+            if sl["id"] == self._list_id:
+                self._attr_name = sl["name"]
+        super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        # Served from the cache, so only a deleted list is unavailable
+        return any(sl["id"] == self._list_id for sl in self.coordinator.lists)
+
+    @property
+    def todo_items(self) -> list[TodoItem] | None:
+        items = self.coordinator.list_items(self._list_id)
+        if items is None:
+            return None
+        return [
+            TodoItem(
+                uid=item["id"],
+                summary=item["name"],
+                status=(
+                    TodoItemStatus.COMPLETED
+                    if item["crossed_off"]
+                    else TodoItemStatus.NEEDS_ACTION
+                ),
+                description=item.get("note") or None,
+            )
+            for item in items
+        ]
+
+    def _item(self, uid: str) -> dict | None:
+        items = self.coordinator.list_items(self._list_id) or []
+        return next((item for item in items if item["id"] == uid), None)
+
+    async def async_create_todo_item(self, item: TodoItem) -> None:
+        result = await self.coordinator.async_enqueue(
+            "add_item", list_id=self._list_id, name=item.summary
+        )
+        if item.status == TodoItemStatus.COMPLETED:
+            await self.coordinator.async_enqueue(
+                "toggle_crossed_off",
+                list_id=self._list_id,
+                item_id=result["item_id"],
+                cross_off=True,
+            )
+
+    async def async_update_todo_item(self, item: TodoItem) -> None:
+        current = self._item(item.uid)
+        if current is None:
+            raise ValueError(f"Item {item.uid} is not on this list")
+        if item.summary is not None and item.summary != current["name"]:
+            await self.coordinator.async_enqueue(
+                "update_item",
+                list_id=self._list_id,
+                item_id=item.uid,
+                name=item.summary,
+                category_id=current.get("category_id") or "",
+            )
+        if item.status is not None:
+            cross_off = item.status == TodoItemStatus.COMPLETED
+            if cross_off != current["crossed_off"]:
+                await self.coordinator.async_enqueue(
+                    "toggle_crossed_off",
+                    list_id=self._list_id,
+                    item_id=item.uid,
+                    cross_off=cross_off,
+                )
+
+    async def async_delete_todo_items(self, uids: list[str]) -> None:
+        for uid in uids:
+            await self.coordinator.async_enqueue(
+                "remove_item", list_id=self._list_id, item_id=uid
+            )
@@ -0,0 +1,151 @@
+"""Opt-in request tracing for the OurGroceries Kiosk integration.
+
+While tracing is enabled, each WebSocket command records a span tree:
+the command, the OurGroceriesAPI methods it called and every upstream
+HTTP request those made, with timings, payload sizes and retry and
+re-login events.  The most recent traces are kept in memory and shown
+in the diagnostics download and by the ``get_traces`` command.
+
+When tracing is off no span is ever current, so instrumented code only
+pays for a context variable lookup.
+"""
+
+import contextlib
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextvars import ContextVar
+from datetime import UTC, datetime
+
+from .const import TRACE_BUFFER_SIZE
+
+_current: ContextVar["Span | None"] = ContextVar(
+    "ourgroceries_span", default=None
+)
+
+
+class Span:
+    """One timed step of a traced command."""
+
+    __slots__ = ("name", "attrs", "start", "end", "error", "events", "children")
+
+    def __init__(self, name: str, attrs: dict) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.start = time.monotonic()
+        self.end: float | None = None
+        self.error: str | None = None
+        # (time, name, attributes) of things that happened during the span
+        self.events: list[tuple[float, str, dict]] = []
+        self.children: list[Span] = []
+
+    def as_dict(self, origin: float | None = None) -> dict:
+        """Return the span tree, times in ms relative to ``origin``."""
+        if origin is None:
+            origin = self.start
+        result = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 1),
+            "duration_ms": (
+                round((self.end - self.start) * 1000, 1)
+                if self.end is not None
+                else None
+            ),
+            **self.attrs,
+        }
+        if self.error is not None:
+            result["error"] = self.error
+        if self.events:
+            result["events"] = [
+                {"name": name, "at_ms": round((at - origin) * 1000, 1), **attrs}
+                for at, name, attrs in self.events
+            ]
+        if self.children:
+            result["children"] = [
+                child.as_dict(origin)
+                for child in sorted(self.children, key=lambda c: c.start)
+            ]
+        return result
+
+
+def describe(err: BaseException) -> str:
+    """Summarize an exception for a trace.
+
+    Not its repr, which for aiohttp errors includes the request headers
+    and with them the session cookie.
+    """
+    return f"{type(err).__name__}: {err}"
+
+
+@contextlib.contextmanager
+def _enter(span: Span) -> Iterator[Span]:
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as err:
+        span.error = describe(err)
+        raise
+    finally:
+        span.end = time.monotonic()
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs) -> Iterator[Span | None]:
+    """Time a step as a child of the current span, if a trace is running.
+
+    Yields the new span (None when not tracing) so the caller can add
+    attributes it only learns along the way.  Tasks started inside the
+    block attach their spans to it.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    with _enter(child):
+        yield child
+
+
+def event(name: str, **attrs) -> None:
+    """Record an event, such as a retry, on the current span.
+
+    Exceptions among the attributes are recorded as their description.
+    """
+    current = _current.get()
+    if current is None:
+        return
+    for key, value in attrs.items():
+        if isinstance(value, BaseException):
+            attrs[key] = describe(value)
+    current.events.append((time.monotonic(), name, attrs))
+
+
+class Tracer:
+    """Records traces while enabled and keeps the most recent ones."""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE) -> None:
+        self.enabled = False
+        self._traces: deque[Span] = deque(maxlen=size)
+
+    @contextlib.contextmanager
+    def trace(self, name: str, **attrs) -> Iterator[Span | None]:
+        """Record the block as a new trace, if tracing is enabled."""
+        if not self.enabled:
+            yield None
+            return
+        attrs["at"] = datetime.now(UTC).isoformat(timespec="milliseconds")
+        root = Span(name, attrs)
+        try:
+            with _enter(root):
+                yield root
+        finally:
+            self._traces.append(root)
+
+    def as_list(self) -> list[dict]:
+        """Return the kept traces, oldest first."""
+        return [root.as_dict() for root in self._traces]
+
+    def clear(self) -> None:
+        self._traces.clear()
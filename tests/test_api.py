@@ -0,0 +1,191 @@
+"""Tests for the retry policy and circuit breaker of OurGroceriesAPI."""
+
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from custom_components.ourgroceries_kiosk import api
+from custom_components.ourgroceries_kiosk.api import (
+    OurGroceriesAPI,
+    UpstreamUnavailable,
+)
+from custom_components.ourgroceries_kiosk.const import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    RETRY_ATTEMPTS,
+)
+from custom_components.ourgroceries_kiosk.metrics import Metrics
+
+
+class FakeClient:
+    """Stands in for the ourgroceries client, failing as scripted."""
+
+    def __init__(self) -> None:
+        # Exceptions the next calls raise, in order; then calls succeed
+        self.errors: list[Exception] = []
+        self.calls = 0
+        self.logins = 0
+        self.items: list[dict] = []
+        # Set once a list read has started; holds list reads until set
+        self.read_started = asyncio.Event()
+        self.reading = asyncio.Event()
+        self.reading.set()
+
+    async def login(self) -> None:
+        self.logins += 1
+
+    async def get_my_lists(self) -> dict:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"shoppingLists": []}
+
+    async def add_item_to_list(self, list_id: str, name: str, **kwargs) -> None:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        self.items.append({"id": str(len(self.items)), "value": name})
+
+    async def get_list_items(self, list_id: str) -> dict:
+        items = list(self.items)
+        self.read_started.set()
+        await self.reading.wait()
+        return {"list": {"id": list_id, "items": items}}
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> FakeClient:
+    fake = FakeClient()
+    monkeypatch.setattr(api.og, "OurGroceries", lambda username, password: fake)
+    monkeypatch.setattr(api, "RETRY_BACKOFF", 0)
+    return fake
+
+
+def _server_error() -> aiohttp.ClientResponseError:
+    url = URL("https://www.ourgroceries.com/your-lists/")
+    request = aiohttp.RequestInfo(url, "POST", CIMultiDictProxy(CIMultiDict()), url)
+    return aiohttp.ClientResponseError(request, (), status=503)
+
+
+async def _open_breaker(og_api: OurGroceriesAPI, client: FakeClient) -> None:
+    client.errors = [_server_error()] * (BREAKER_THRESHOLD * RETRY_ATTEMPTS)
+    for _ in range(BREAKER_THRESHOLD):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await og_api.get_lists()
+    with pytest.raises(UpstreamUnavailable):
+        await og_api.get_lists()
+
+
+def _end_cooldown(og_api: OurGroceriesAPI) -> None:
+    og_api._breaker._opened_at -= BREAKER_COOLDOWN
+
+
+async def test_breaker_closes_after_successful_trial(client: FakeClient) -> None:
+    og_api = OurGroceriesAPI("user", "password")
+    await _open_breaker(og_api, client)
+    calls = client.calls
+
+    _end_cooldown(og_api)
+    assert await og_api.get_lists() == []
+    assert client.calls == calls + 1
+    assert await og_api.get_lists() == []
+
+
+async def test_breaker_reopens_after_failed_trial(client: FakeClient) -> None:
+    og_api = OurGroceriesAPI("user", "password")
+    await _open_breaker(og_api, client)
+
+    _end_cooldown(og_api)
+    client.errors = [_server_error()] * RETRY_ATTEMPTS
+    with pytest.raises(aiohttp.ClientResponseError):
+        await og_api.get_lists()
+    with pytest.raises(UpstreamUnavailable):
+        await og_api.get_lists()
+
+
+async def test_breaker_trial_without_verdict(client: FakeClient) -> None:
+    """A trial failing on the session leaves room for another trial."""
+    og_api = OurGroceriesAPI("user", "password")
+    await _open_breaker(og_api, client)
+
+    _end_cooldown(og_api)
+    # Fails again after the re-login, so the call gives up
+    client.errors = [ValueError("not JSON"), ValueError("not JSON")]
+    with pytest.raises(ValueError):
+        await og_api.get_lists()
+    assert client.logins == 2
+
+    assert await og_api.get_lists() == []
+    assert await og_api.get_lists() == []
+
+
+async def test_add_not_retried_after_server_error(client: FakeClient) -> None:
+    """The item may have been added before the error; don't add it twice."""
+    og_api = OurGroceriesAPI("user", "password")
+    client.errors = [_server_error()]
+    with pytest.raises(aiohttp.ClientResponseError):
+        await og_api.add_item("list", "Milk")
+    assert client.calls == 1
+
+
+async def test_add_retried_when_never_sent(client: FakeClient) -> None:
+    og_api = OurGroceriesAPI("user", "password")
+    connection = SimpleNamespace(host="www.ourgroceries.com", port=443, ssl=True)
+    client.errors = [
+        aiohttp.ClientConnectorError(connection, OSError("Connection refused"))
+    ]
+    await og_api.add_item("list", "Milk")
+    assert client.calls == 2
+
+
+async def test_read_after_write_not_joined_to_older_read(
+    client: FakeClient,
+) -> None:
+    og_api = OurGroceriesAPI("user", "password")
+    client.reading.clear()
+    before = asyncio.ensure_future(og_api.get_list("list"))
+    await client.read_started.wait()
+
+    await og_api.add_item("list", "Milk")
+    after = asyncio.ensure_future(og_api.get_list("list"))
+    await asyncio.sleep(0)
+    client.reading.set()
+
+    assert (await before)["items"] == []
+    assert [item["name"] for item in (await after)["items"]] == ["Milk"]
+
+
+class FakeSession:
+    """Stands in for the aiohttp session, answering with scripted statuses."""
+
+    def __init__(self, statuses: list[int]) -> None:
+        self.statuses = statuses
+
+    @contextlib.asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        status = self.statuses.pop(0)
+
+        async def payload():
+            return {}
+
+        async def body():
+            return b"{}"
+
+        yield SimpleNamespace(status=status, json=payload, read=body)
+
+
+async def test_pooled_client_counts_each_request() -> None:
+    metrics = Metrics()
+    client = api._PooledClient("user", "secret", FakeSession([200, 503]), metrics)
+    client._session_key = "key"
+
+    await client._post("getOverview")
+    await client._post("getOverview")
+
+    assert metrics.upstream_requests == 2
+    assert metrics.upstream_errors == 1
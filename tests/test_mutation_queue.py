@@ -0,0 +1,124 @@
+"""Tests for coalescing in the write-behind mutation queue."""
+
+import asyncio
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.ourgroceries_kiosk.api import UpstreamUnavailable
+from custom_components.ourgroceries_kiosk.mutation_queue import MutationQueue
+
+
+class Upstream:
+    """Records the entries the queue applies; can hold them until released."""
+
+    def __init__(self) -> None:
+        self.applied: list[dict] = []
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+        # Raised by the next applies, in order
+        self.errors: list[Exception] = []
+
+    async def apply(self, entry: dict) -> None:
+        self.started.set()
+        await self.release.wait()
+        if self.errors:
+            raise self.errors.pop(0)
+        self.applied.append(entry)
+
+    async def flushed(self, list_ids: set[str]) -> None:
+        pass
+
+
+def _queue(hass: HomeAssistant, upstream: Upstream) -> MutationQueue:
+    return MutationQueue(hass, "entry", upstream.apply, upstream.flushed)
+
+
+async def test_toggle_folded_into_pending_add(hass: HomeAssistant) -> None:
+    upstream = Upstream()
+    queue = _queue(hass, upstream)
+    added = await queue.async_enqueue("add_item", {"list_id": "L", "name": "Milk"})
+    await queue.async_enqueue(
+        "toggle_crossed_off",
+        {"list_id": "L", "item_id": added["item_id"], "cross_off": True},
+    )
+
+    assert [entry["op"] for entry in queue._pending] == ["add_item"]
+    assert queue._pending[0]["args"]["cross_off"] is True
+    (item,) = queue.overlay("L", [])
+    assert item["id"] == added["item_id"]
+    assert item["crossed_off"] is True
+
+
+async def test_toggle_of_sent_add_carries_name(hass: HomeAssistant) -> None:
+    upstream = Upstream()
+    upstream.release.clear()
+    queue = _queue(hass, upstream)
+    stop = queue.async_start()
+    added = await queue.async_enqueue("add_item", {"list_id": "L", "name": "Milk"})
+    await upstream.started.wait()
+
+    await queue.async_enqueue(
+        "update_item",
+        {"list_id": "L", "item_id": added["item_id"], "name": "Oat milk"},
+    )
+    await queue.async_enqueue(
+        "toggle_crossed_off",
+        {"list_id": "L", "item_id": added["item_id"], "cross_off": True},
+    )
+    assert [entry["name"] for entry in queue._pending] == ["Milk", "Oat milk"]
+
+    upstream.release.set()
+    while len(upstream.applied) < 3:
+        await asyncio.sleep(0)
+    assert [entry["op"] for entry in upstream.applied] == [
+        "add_item", "update_item", "toggle_crossed_off"
+    ]
+    stop()
+
+
+async def test_entry_failing_for_good_is_dropped(hass: HomeAssistant) -> None:
+    upstream = Upstream()
+    upstream.errors = [ValueError("Item not found")]
+    queue = _queue(hass, upstream)
+    stop = queue.async_start()
+    await queue.async_enqueue("remove_item", {"list_id": "L", "item_id": "a"})
+    await queue.async_enqueue("remove_item", {"list_id": "L", "item_id": "b"})
+
+    while upstream.errors or queue._pending:
+        await asyncio.sleep(0)
+    assert [entry["args"]["item_id"] for entry in upstream.applied] == ["b"]
+    stop()
+
+
+async def test_flush_waits_for_the_lists_entries(hass: HomeAssistant) -> None:
+    upstream = Upstream()
+    upstream.release.clear()
+    queue = _queue(hass, upstream)
+    stop = queue.async_start()
+    await queue.async_enqueue("remove_item", {"list_id": "L", "item_id": "a"})
+    await upstream.started.wait()
+
+    # Nothing queued for another list
+    await queue.async_flush(["M"])
+    flush = asyncio.ensure_future(queue.async_flush(["L"]))
+    await asyncio.sleep(0)
+    assert not flush.done()
+    upstream.release.set()
+    await flush
+    assert len(upstream.applied) == 1
+    stop()
+
+
+async def test_flush_fails_while_backing_off(hass: HomeAssistant) -> None:
+    upstream = Upstream()
+    upstream.errors = [aiohttp.ServerTimeoutError()]
+    queue = _queue(hass, upstream)
+    stop = queue.async_start()
+    await queue.async_enqueue("remove_item", {"list_id": "L", "item_id": "a"})
+
+    with pytest.raises(UpstreamUnavailable):
+        await queue.async_flush(["L"])
+    stop()